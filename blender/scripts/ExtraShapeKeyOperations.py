@@ -1,7 +1,7 @@
 bl_info = {
     "name": "Extra mesh shape key operations",
     "author": "Mysteryem",
-    "version": (1, 0, 0),
+    "version": (1, 4, 0),
     "blender": (2, 93, 7),  # Older versions have not been tested
     "location": "Editmode > Vertex",
     "tracker_url": "https://github.com/Mysteryem/Miscellaneous/issues",
@@ -18,8 +18,17 @@ Transfer Pending Shape Changes
     Intended for when you have just made some changes, but had the wrong shape key active
     This can be finicky as undoing and other operations can cause pending shape changes to be saved
 
+Transfer Pending Shape Changes (Multiple)
+    Transfer pending changes of selected vertices made to the active shape key, to multiple other shape keys, each
+    scaled by its own weight
+    Intended for distributing a correction across several shape keys, e.g. left/right versions of a shape key
+
 Average Shape Key Movement
     Average the shape key movement of the selected vertices
+    The average can be weighted by a vertex group or by a falloff from the active vertex, or made robust to outliers by
+    using the median or a trimmed mean
+    The NumPy engine briefly switches to Object mode to read and write the shape keys in bulk, which is much faster on
+    meshes with many vertices
 
 Blend from Shape (Active Vertex)
     Blend from Shape, but applying the movement of the active vertex to the selected vertices
@@ -28,12 +37,178 @@ Blend from Shape (Active Vertex)
 
 import bpy
 import bmesh
-from typing import Generator
-from bpy.types import Operator, Mesh, Object, Context, PropertyGroup
+import numpy as np
+from itertools import chain, compress
+from typing import Generator, Iterable
+from bpy.types import Operator, Mesh, Object, Context, PropertyGroup, ShapeKey
 from bpy.props import FloatProperty, BoolProperty, StringProperty, CollectionProperty, EnumProperty
 from bmesh.types import BMVert
 from mathutils import Vector
 
+# Uses MeshDataAccess.py when it's installed alongside this addon. Otherwise, minimal versions of the functions are
+# defined here so that this addon also works when installed on its own or run from the Text Editor, just without
+# re-using arrays or the faster attribute access of Blender 3.5+
+try:
+    from MeshDataAccess import (get_selection, get_hidden, get_shape_key, set_shape_key, get_deform_weights,
+                                buffer_pool, object_mode_round_trip, profile_execute, phase)
+except ImportError:
+    from contextlib import contextmanager, nullcontext
+
+    class _BufferPool:
+        """Stand-in for MeshDataAccess.buffer_pool that allocates new arrays instead of re-using them"""
+        def acquire(self, shape, dtype):
+            return np.empty(shape, dtype=dtype)
+
+        def release(self, *arrays):
+            pass
+
+        @contextmanager
+        def borrow(self, shape, dtype):
+            yield np.empty(shape, dtype=dtype)
+
+    buffer_pool = _BufferPool()
+
+    @contextmanager
+    def object_mode_round_trip(mode='EDIT'):
+        if mode == 'OBJECT':
+            yield
+            return
+        bpy.ops.object.mode_set(mode='OBJECT')
+        try:
+            yield
+        finally:
+            bpy.ops.object.mode_set(mode=mode)
+
+    def profile_execute(execute):
+        return execute
+
+    def phase(_name):
+        return nullcontext()
+
+    def get_shape_key(shape_key, out=None):
+        if out is None:
+            out = np.empty((len(shape_key.data), 3), dtype=np.single)
+        shape_key.data.foreach_get("co", out.ravel())
+        return out
+
+    def set_shape_key(shape_key, cos):
+        shape_key.data.foreach_set("co", np.ascontiguousarray(cos, dtype=np.single).ravel())
+
+    def _get_flags(me, domain, prop, out):
+        collection = getattr(me, {'VERTEX': 'vertices', 'EDGE': 'edges', 'FACE': 'polygons'}[domain])
+        if out is None:
+            out = np.empty(len(collection), dtype=bool)
+        collection.foreach_get(prop, out)
+        return out
+
+    def get_selection(me, domain='VERTEX', out=None):
+        return _get_flags(me, domain, "select", out)
+
+    def get_hidden(me, domain='VERTEX', out=None):
+        return _get_flags(me, domain, "hide", out)
+
+    def get_vertex_group_arrays(me, vertex_indices=None):
+        vertices = me.vertices if vertex_indices is None else [me.vertices[i] for i in vertex_indices.tolist()]
+        offsets = np.zeros(len(vertices) + 1, dtype=np.intc)
+        np.cumsum(np.fromiter((len(v.groups) for v in vertices), dtype=np.intc, count=len(vertices)), out=offsets[1:])
+        group_indices = np.empty(offsets[-1], dtype=np.intc)
+        weights = np.empty(offsets[-1], dtype=np.single)
+        for v, start, end in zip(vertices, offsets[:-1].tolist(), offsets[1:].tolist()):
+            if start != end:
+                v.groups.foreach_get('group', group_indices[start:end])
+                v.groups.foreach_get('weight', weights[start:end])
+        return offsets, group_indices, weights
+
+    def get_deform_weights(me, group_index, out=None, vertex_group_arrays=None, vertex_indices=None):
+        num_verts = len(me.vertices) if vertex_indices is None else len(vertex_indices)
+        if out is None:
+            out = np.empty(num_verts, dtype=np.single)
+        out.fill(0)
+        offsets, group_indices, weights = vertex_group_arrays or get_vertex_group_arrays(me, vertex_indices)
+        in_group = group_indices == group_index
+        out[np.repeat(np.arange(num_verts), np.diff(offsets))[in_group]] = weights[in_group]
+        return out
+
+
+# engine constants
+_engine_bmesh = 'BMESH'
+_engine_numpy = 'NUMPY'
+
+# average mode constants
+_average_mean = 'MEAN'
+_average_vertex_group = 'VERTEX_GROUP'
+_average_falloff = 'FALLOFF'
+_average_median = 'MEDIAN'
+_average_trimmed = 'TRIMMED'
+_weighted_average_modes = {_average_vertex_group, _average_falloff}
+
+
+# Pending shape key changes only exist in the edit mesh and would be saved by leaving Edit mode, so they can't be
+# accessed with foreach_get. Instead, the visible selected BMVerts are gathered in a single pass over the BMesh, only
+# their coordinates are read into arrays, changes are calculated with NumPy and only the vertices that actually change
+# are written back.
+# The coordinates are read as double precision. Copying and comparing coordinates is exact, but arithmetic is only
+# rounded to single precision when written back, whereas mathutils.Vector rounds after every operation, so results of
+# arithmetic can differ from calculating with mathutils.Vector in the last bit.
+def get_visible_selected_bmverts(bm_verts: bmesh.types.BMVertSeq) -> list[BMVert]:
+    return [bv for bv in bm_verts if bv.select and not bv.hide]
+
+
+def get_bmvert_cos(bmverts: list[BMVert], shape_layer=None) -> np.ndarray:
+    """Read the co, or the co in a shape layer, of each BMVert into an (N, 3) array"""
+    if shape_layer is None:
+        values = chain.from_iterable(bv.co for bv in bmverts)
+    else:
+        values = chain.from_iterable(bv[shape_layer] for bv in bmverts)
+    return np.fromiter(values, dtype=np.double, count=len(bmverts) * 3).reshape(-1, 3)
+
+
+def set_bmvert_cos(bmverts: Iterable[BMVert], cos: np.ndarray, shape_layer=None):
+    """Set the co, or the co in a shape layer, of each BMVert.
+    e.g. set_bmvert_cos(compress(bmverts, mask), cos[mask])"""
+    if shape_layer is None:
+        for bv, co in zip(bmverts, cos.tolist()):
+            bv.co = co
+    else:
+        for bv, co in zip(bmverts, cos.tolist()):
+            bv[shape_layer] = co
+
+
+def average_movement(movement: np.ndarray, mode: str, weights: np.ndarray = None, trim: float = 0.0):
+    """Average an (N, 3) array of movements with one of the average mode constants.
+    The weighted modes require an (N,) array of weights and return None when the weights sum to zero.
+    The median and trimmed mean are taken for each axis separately."""
+    if mode in _weighted_average_modes:
+        total_weight = weights.sum(dtype=np.double)
+        if total_weight == 0:
+            return None
+        return weights.astype(np.double) @ movement / total_weight
+    elif mode == _average_median:
+        return np.median(movement, axis=0)
+    elif mode == _average_trimmed:
+        num = len(movement)
+        num_trimmed = int(num * trim)
+        if num_trimmed == 0:
+            return movement.mean(axis=0, dtype=np.double)
+        # Only the values that get trimmed from each end need to be separated from the rest, which is quicker than a
+        # full sort
+        partitioned = np.partition(movement, (num_trimmed, num - num_trimmed - 1), axis=0)
+        return partitioned[num_trimmed:num - num_trimmed].mean(axis=0, dtype=np.double)
+    else:
+        return movement.mean(axis=0, dtype=np.double)
+
+
+def falloff_weights(world_cos: np.ndarray, center: Vector, radius: float) -> np.ndarray:
+    """Smooth falloff from 1.0 at center to 0.0 at radius"""
+    distances = np.linalg.norm(world_cos - np.array(center, dtype=np.double), axis=1)
+    t = 1.0 - np.clip(distances / radius, 0.0, 1.0)
+    return t * t * (3.0 - 2.0 * t)
+
+
+def to_world_space(obj: Object, cos: np.ndarray) -> np.ndarray:
+    matrix = np.array(obj.matrix_world, dtype=np.double)
+    return cos @ matrix[:3, :3].T + matrix[:3, 3]
+
 
 class OperatorBase(Operator):
     # Pre-3.0 support because poll_message_set was added in 3.0
@@ -84,12 +259,13 @@ Note that many actions will save all pending changes, such as undoing"""
 
             meshes_to_update.append(me)
             bm = bmesh.from_edit_mesh(me)
-            active_shape_layer = bm.verts.layers.shape[obj.active_shape_key_index]
-            bmverts = (bv for bv in bm.verts if bv.select and not bv.hide)
+            bm_verts = bm.verts
+            active_shape_layer = bm_verts.layers.shape[obj.active_shape_key_index]
 
-            bv: BMVert
-            for bv in bmverts:
-                bv.co = bv[active_shape_layer]
+            selected_bmverts = get_visible_selected_bmverts(bm_verts)
+            active_cos = get_bmvert_cos(selected_bmverts, active_shape_layer)
+            pending = (get_bmvert_cos(selected_bmverts) != active_cos).any(axis=1)
+            set_bmvert_cos(compress(selected_bmverts, pending), active_cos[pending])
 
             bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
 
@@ -196,32 +372,34 @@ Note:
         if me.total_vert_sel == 0:
             return {'FINISHED'}
 
+        if self.mode not in {'ADD', 'REPLACE', 'REPLACE_CHANGED'}:
+            self.report({'ERROR'}, f"Unexpected mode '{self.mode}'")
+            return {'FINISHED'}
+
         bm = bmesh.from_edit_mesh(me)
-        active_shape_layer = bm.verts.layers.shape[obj.active_shape_key_index]
-        other_shape_layer = bm.verts.layers.shape[self.shape_key_name]
-        bmverts = (bv for bv in bm.verts if bv.select and not bv.hide)
+        bm_verts = bm.verts
+        active_shape_layer = bm_verts.layers.shape[obj.active_shape_key_index]
+        other_shape_layer = bm_verts.layers.shape[self.shape_key_name]
+
+        selected_bmverts = get_visible_selected_bmverts(bm_verts)
+        cos = get_bmvert_cos(selected_bmverts)
+        active_cos = get_bmvert_cos(selected_bmverts, active_shape_layer)
+        other_cos = get_bmvert_cos(selected_bmverts, other_shape_layer)
+        pending_change = cos - active_cos
+        changed = pending_change.any(axis=1)
 
-        bv: BMVert
         if self.mode == 'ADD':
-            for bv in bmverts:
-                pending_change = bv.co - bv[active_shape_layer]
-                #
-                if any(pending_change):
-                    bv[other_shape_layer] += pending_change
-                    bv.co = bv[active_shape_layer]
+            other_cos += pending_change
+            other_changed = changed
         elif self.mode == 'REPLACE':
-            for bv in bmverts:
-                bv[other_shape_layer] = bv.co
-                bv.co = bv[active_shape_layer]
-        elif self.mode == 'REPLACE_CHANGED':
-            for bv in bmverts:
-                pre_change_active_co = bv[active_shape_layer]
-                if bv.co != pre_change_active_co:
-                    bv[other_shape_layer] = bv.co
-                    bv.co = pre_change_active_co
-        else:
-            self.report({'ERROR'}, f"Unexpected mode '{self.mode}'")
-            return {'FINISHED'}
+            other_changed = (other_cos != cos).any(axis=1)
+            other_cos = cos
+        else:  # elif self.mode == 'REPLACE_CHANGED':
+            other_changed = changed
+            other_cos = cos
+
+        set_bmvert_cos(compress(selected_bmverts, other_changed), other_cos[other_changed], other_shape_layer)
+        set_bmvert_cos(compress(selected_bmverts, changed), active_cos[changed])
 
         if self.swap_after_execute:
             # Don't need to update the edit mesh if we change the active shape key, since it will refresh the 3D view
@@ -250,6 +428,108 @@ Note:
         return wm.invoke_props_dialog(self)
 
 
+class ShapeKeyWeight(PropertyGroup):
+    weight: FloatProperty(
+        name="Weight",
+        description="Multiplier of the pending changes transferred to this shape key",
+        default=0.0,
+        soft_min=-1.0,
+        soft_max=1.0,
+    )
+
+
+class TransferPendingChangesMulti(OperatorBase):
+    """Transfer pending changes of selected vertices of the active shape key to multiple other shape keys, scaled by a
+weight for each shape key.
+Note:
+ Normals visual bug
+ Does not update shape keys relative to the keys transferred to
+ Many actions save all pending changes, such as undoing"""
+    bl_idname = "mesh.mysteryem_transfer_pending_shape_key_changes_multi"
+    bl_label = "Transfer Pending Shape Changes (Multiple)"
+    # No 'REGISTER' because operator redo does not work due to the shape key getting updated when performing an undo
+    bl_options = {'UNDO'}
+
+    shape_key_weights: CollectionProperty(
+        type=ShapeKeyWeight,
+        name="Weights",
+        description="Shape keys to transfer to and the weight to transfer to each one. Shape keys with zero weight are"
+                    " skipped",
+        options={'SKIP_SAVE'},
+    )
+
+    def draw(self, context):
+        layout = self.layout
+        layout.use_property_split = True
+        col = layout.column()
+        for shape_key_weight in self.shape_key_weights:
+            col.prop(shape_key_weight, 'weight', text=shape_key_weight.name)
+
+    @classmethod
+    def poll(cls, context: Context) -> bool:
+        return TransferPendingChanges.poll(context)
+
+    def execute(self, context) -> set[str]:
+        obj = context.object
+        me = obj.data
+        key_blocks = me.shape_keys.key_blocks
+        active_name = obj.active_shape_key.name
+
+        if me.total_vert_sel == 0:
+            return {'FINISHED'}
+
+        bm = bmesh.from_edit_mesh(me)
+        bm_verts = bm.verts
+        shape_layers = bm_verts.layers.shape
+        active_shape_layer = shape_layers[obj.active_shape_key_index]
+
+        weighted_layers = []
+        for shape_key_weight in self.shape_key_weights:
+            name = shape_key_weight.name
+            weight = shape_key_weight.weight
+            if weight == 0.0:
+                continue
+            if name not in key_blocks:
+                self.report({'ERROR_INVALID_INPUT'}, f"Shape key '{name}' not found")
+                return {'FINISHED'}
+            if name == active_name:
+                self.report({'ERROR_INVALID_INPUT'}, "The shape keys to transfer to must not be the active shape key")
+                return {'FINISHED'}
+            weighted_layers.append((shape_layers[name], weight))
+
+        if not weighted_layers:
+            self.report({'WARNING'}, "All weights are zero, nothing to transfer")
+            return {'FINISHED'}
+
+        # The pending changes are calculated once for all the shape keys
+        selected_bmverts = get_visible_selected_bmverts(bm_verts)
+        active_cos = get_bmvert_cos(selected_bmverts, active_shape_layer)
+        pending_change = get_bmvert_cos(selected_bmverts) - active_cos
+        changed = pending_change.any(axis=1)
+
+        for bv, change, active_co in zip(compress(selected_bmverts, changed), pending_change[changed].tolist(),
+                                         active_cos[changed].tolist()):
+            change = Vector(change)
+            for shape_layer, weight in weighted_layers:
+                bv[shape_layer] += change * weight
+            bv.co = active_co
+
+        bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
+        return {'FINISHED'}
+
+    def invoke(self, context: Context, event) -> set[str]:
+        self.shape_key_weights.clear()
+        active_name = context.object.active_shape_key.name
+        # Set up the collection property to contain the names of all shape keys that aren't the active shape key
+        for shape_key in context.object.data.shape_keys.key_blocks:
+            key_name = shape_key.name
+            if key_name != active_name:
+                self.shape_key_weights.add().name = key_name
+        # Draw the UI to let the user pick the weight of each shape key
+        wm = context.window_manager
+        return wm.invoke_props_dialog(self)
+
+
 class AverageShapeKeyMovement(OperatorBase):
     """Average the shape key movement of the selected vertices.
 If a mesh has no shape keys, its active shape key is the reference key or its active shape key is relative to
@@ -266,6 +546,73 @@ itself, it will be skipped"""
         soft_max=2.0,
     )
 
+    engine: EnumProperty(
+        name="Engine",
+        items=(
+            (_engine_bmesh, "BMesh", "Modify the vertices of the edit meshes one at a time"),
+            (_engine_numpy, "NumPy", "Switch to Object mode and modify the shape keys of all the vertices at once."
+                                     " Much faster on meshes with many vertices"),
+        ),
+        default=_engine_bmesh,
+        description="How the average movement should be calculated and applied",
+    )
+
+    average_mode: EnumProperty(
+        name="Average",
+        items=(
+            (_average_mean, "Mean", "Every selected vertex contributes equally"),
+            (_average_vertex_group, "Vertex Group", "Weight the movement of each selected vertex by its weight in a"
+                                                    " vertex group"),
+            (_average_falloff, "Falloff", "Weight the movement of each selected vertex by a smooth falloff from the"
+                                          " active vertex of the active object"),
+            (_average_median, "Median", "Median movement along each axis, ignoring outliers"),
+            (_average_trimmed, "Trimmed Mean", "Mean movement along each axis after discarding the smallest and"
+                                               " largest movements"),
+        ),
+        default=_average_mean,
+        description="How the movement of the selected vertices should be averaged",
+    )
+
+    vertex_group: StringProperty(
+        name="Vertex Group",
+        description="Vertex group to weight the movement by. Meshes without a vertex group with this name don't"
+                    " contribute to the average, but are still moved",
+    )
+
+    falloff_radius: FloatProperty(
+        name="Radius",
+        description="Distance from the active vertex at which selected vertices stop contributing to the average."
+                    " Distances are measured in world space, using the positions of the relative keys",
+        default=1.0,
+        min=0.0,
+        soft_min=0.0001,
+        subtype='DISTANCE',
+    )
+
+    trim: FloatProperty(
+        name="Trim",
+        description="Fraction of the movements to discard from each end along each axis",
+        default=0.1,
+        min=0.0,
+        max=0.49,
+        subtype='FACTOR',
+    )
+
+    def draw(self, context):
+        layout = self.layout
+        layout.use_property_split = True
+        col = layout.column()
+        col.prop(self, 'mix')
+        col.prop(self, 'engine')
+        col.prop(self, 'average_mode')
+        average_mode = self.average_mode
+        if average_mode == _average_vertex_group:
+            col.prop_search(self, 'vertex_group', context.object, 'vertex_groups')
+        elif average_mode == _average_falloff:
+            col.prop(self, 'falloff_radius')
+        elif average_mode == _average_trimmed:
+            col.prop(self, 'trim')
+
     @staticmethod
     def object_has_relative_shape_keys_and_active_shape_is_not_basis_like(mesh_obj: Object):
         me: Mesh = mesh_obj.data
@@ -291,6 +638,7 @@ itself, it will be skipped"""
                                      " key and isn't relative to itself")
         return False
 
+    @profile_execute
     def execute(self, context: Context) -> set[str]:
         mix = self.mix
         if mix == 0.0:
@@ -298,43 +646,257 @@ itself, it will be skipped"""
 
         objects: list[Object] = context.objects_in_mode_unique_data
 
+        average_mode = self.average_mode
+        falloff_center = None
+        if average_mode == _average_falloff:
+            if self.falloff_radius == 0.0:
+                self.report({'ERROR_INVALID_INPUT'}, "Falloff radius must be greater than zero")
+                return {'CANCELLED'}
+            falloff_center = self.get_falloff_center(context)
+            if falloff_center is None:
+                self.report({'ERROR_INVALID_INPUT'}, "Falloff requires an active vertex in the active object")
+                return {'CANCELLED'}
+
+        if self.engine == _engine_numpy:
+            return self.execute_numpy(objects, mix, falloff_center)
+
+        if average_mode != _average_mean:
+            return self.execute_bmesh_numpy_average(objects, mix, falloff_center)
+
         all_selected_bmverts: list[tuple[BMVert, Vector, Vector]] = []
         sum_movement = Vector()
         meshes_to_update = []
+        with phase("fetch"):
+            for obj in objects:
+                active_shape = obj.active_shape_key
+                if not active_shape or active_shape.relative_key == active_shape:
+                    continue
+
+                me: Mesh = obj.data
+                if not me.shape_keys.use_relative or me.shape_keys.reference_key == active_shape:
+                    continue
+
+                if me.total_vert_sel == 0:
+                    continue
+
+                bm = bmesh.from_edit_mesh(me)
+                relative_shape_layer = bm.verts.layers.shape[active_shape.relative_key.name]
+                bmverts = (bv for bv in bm.verts if bv.select and not bv.hide)
+                bv: BMVert
+                for bv in bmverts:
+                    relative_co = bv[relative_shape_layer]
+                    movement = bv.co - relative_co
+                    all_selected_bmverts.append((bv, relative_co, movement))
+                    sum_movement += movement
+                meshes_to_update.append(me)
+
+        if all_selected_bmverts:
+            # Computing and writing back are the same step with BMesh
+            with phase("write"):
+                average_movement = sum_movement / len(all_selected_bmverts)
+                if mix == 1.0:
+                    for bv, relative_co, _ in all_selected_bmverts:
+                        bv.co = relative_co + average_movement
+                else:
+                    for bv, relative_co, movement in all_selected_bmverts:
+                        bv.co = relative_co + movement.lerp(average_movement, mix)
+
+        with phase("update"):
+            for me in meshes_to_update:
+                bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
+
+        return {'FINISHED'}
+
+    @staticmethod
+    def get_falloff_center(context: Context):
+        """Get the world space position of the active vertex of the active object in its relative key, or None if there
+        is no active vertex"""
+        obj: Object = context.object
+        if obj is None or obj.type != 'MESH':
+            return None
+        bm = bmesh.from_edit_mesh(obj.data)
+        active_vert = bm.select_history.active
+        if not isinstance(active_vert, BMVert):
+            return None
+        active_shape = obj.active_shape_key
+        if active_shape:
+            co = active_vert[bm.verts.layers.shape[active_shape.relative_key.name]]
+        else:
+            co = active_vert.co
+        return obj.matrix_world @ co
+
+    def get_weights(self, obj: Object, relative_cos: np.ndarray, falloff_center, get_group_weights):
+        """Get the weight of each selected vertex of obj for the weighted average modes, or None for the other modes.
+        get_group_weights is called with the index of the vertex group to get the weights of the selected vertices in
+        that vertex group"""
+        average_mode = self.average_mode
+        if average_mode == _average_vertex_group:
+            vertex_group = obj.vertex_groups.get(self.vertex_group)
+            if vertex_group is None:
+                return np.zeros(len(relative_cos), dtype=np.single)
+            return get_group_weights(vertex_group.index)
+        elif average_mode == _average_falloff:
+            return falloff_weights(to_world_space(obj, relative_cos), falloff_center, self.falloff_radius)
+        else:
+            return None
+
+    def get_average_movement(self, movements: list[np.ndarray], weights: list[np.ndarray]):
+        """Average the movements of all the objects, returns None if there is no average"""
+        movement = np.concatenate(movements) if len(movements) > 1 else movements[0]
+        if self.average_mode in _weighted_average_modes:
+            weights = np.concatenate(weights) if len(weights) > 1 else weights[0]
+        else:
+            weights = None
+        average = average_movement(movement, self.average_mode, weights, self.trim)
+        if average is None:
+            self.report({'WARNING'}, "The selected vertices have no weight, nothing was changed")
+        return average
+
+    def execute_bmesh_numpy_average(self, objects: list[Object], mix: float, falloff_center) -> set[str]:
+        """BMesh engine for the average modes other than the mean, the movements are read from the edit meshes into
+        arrays so that the average can be computed with NumPy"""
+        # (mesh, selected BMVerts, relative cos of selected, movement of selected)
+        bms_to_update = []
+        movements = []
+        weights = []
         for obj in objects:
-            active_shape = obj.active_shape_key
-            if not active_shape or active_shape.relative_key == active_shape:
+            if not self.object_has_relative_shape_keys_and_active_shape_is_not_basis_like(obj):
                 continue
 
             me: Mesh = obj.data
-            if not me.shape_keys.use_relative or me.shape_keys.reference_key == active_shape:
-                continue
-
             if me.total_vert_sel == 0:
                 continue
 
-            bm = bmesh.from_edit_mesh(me)
-            relative_shape_layer = bm.verts.layers.shape[active_shape.relative_key.name]
-            bmverts = (bv for bv in bm.verts if bv.select and not bv.hide)
-            bv: BMVert
-            for bv in bmverts:
-                relative_co = bv[relative_shape_layer]
-                movement = bv.co - relative_co
-                all_selected_bmverts.append((bv, relative_co, movement))
-                sum_movement += movement
-            meshes_to_update.append(me)
+            with phase("fetch"):
+                bm = bmesh.from_edit_mesh(me)
+                bm_verts = bm.verts
+                selected_bmverts = get_visible_selected_bmverts(bm_verts)
+                if not selected_bmverts:
+                    continue
+
+                relative_shape_layer = bm_verts.layers.shape[obj.active_shape_key.relative_key.name]
+                relative_cos = get_bmvert_cos(selected_bmverts, relative_shape_layer)
+                movement = get_bmvert_cos(selected_bmverts) - relative_cos
+
+            def get_group_weights(group_index):
+                deform_layer = bm_verts.layers.deform.active
+                if deform_layer is None:
+                    return np.zeros(len(selected_bmverts), dtype=np.single)
+                return np.fromiter((bv[deform_layer].get(group_index, 0.0) for bv in selected_bmverts),
+                                   dtype=np.single, count=len(selected_bmverts))
+
+            with phase("compute"):
+                weights.append(self.get_weights(obj, relative_cos, falloff_center, get_group_weights))
+            movements.append(movement)
+            bms_to_update.append((me, selected_bmverts, relative_cos, movement))
+
+        if not bms_to_update:
+            return {'FINISHED'}
 
-        if all_selected_bmverts:
-            average_movement = sum_movement / len(all_selected_bmverts)
-            if mix == 1.0:
-                for bv, relative_co, _ in all_selected_bmverts:
-                    bv.co = relative_co + average_movement
-            else:
-                for bv, relative_co, movement in all_selected_bmverts:
-                    bv.co = relative_co + movement.lerp(average_movement, mix)
+        with phase("compute"):
+            average = self.get_average_movement(movements, weights)
+        if average is None:
+            return {'CANCELLED'}
 
-        for me in meshes_to_update:
-            bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
+        for me, selected_bmverts, relative_cos, movement in bms_to_update:
+            with phase("compute"):
+                if mix == 1.0:
+                    new_cos = relative_cos + average
+                else:
+                    # Equivalent to movement.lerp(average_movement, mix)
+                    new_cos = relative_cos + movement + (average - movement) * mix
+            with phase("write"):
+                set_bmvert_cos(selected_bmverts, new_cos)
+            with phase("update"):
+                bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
+
+        return {'FINISHED'}
+
+    def execute_numpy(self, objects: list[Object], mix: float, falloff_center) -> set[str]:
+        with object_mode_round_trip():
+            # (active shape key, all shape key cos, relative key cos, selected vertices mask with shape (num_verts, 1))
+            shapes_to_update: list[tuple[ShapeKey, np.ndarray, np.ndarray, np.ndarray]] = []
+            # Sum as double precision to avoid losing precision when summing many vertices
+            sum_movement = np.zeros(3, dtype=np.double)
+            num_selected = 0
+            use_mean = self.average_mode == _average_mean
+            # Only used by the average modes other than the mean
+            movements = []
+            weights = []
+            # Arrays acquired from buffer_pool, they're needed until the average has been applied to every mesh
+            acquired = []
+            try:
+                for obj in objects:
+                    if not self.object_has_relative_shape_keys_and_active_shape_is_not_basis_like(obj):
+                        continue
+
+                    me: Mesh = obj.data
+                    if me.total_vert_sel == 0:
+                        continue
+
+                    with phase("fetch"):
+                        num_verts = len(me.vertices)
+                        selected = buffer_pool.acquire(num_verts, bool)
+                        acquired.append(selected)
+                        get_selection(me, out=selected)
+                        with buffer_pool.borrow(num_verts, bool) as hidden:
+                            selected &= np.logical_not(get_hidden(me, out=hidden), out=hidden)
+                        if not selected.any():
+                            continue
+
+                        active_shape = obj.active_shape_key
+                        cos = buffer_pool.acquire((num_verts, 3), np.single)
+                        relative_cos = buffer_pool.acquire((num_verts, 3), np.single)
+                        acquired.extend((cos, relative_cos))
+                        get_shape_key(active_shape, out=cos)
+                        get_shape_key(active_shape.relative_key, out=relative_cos)
+
+                    with phase("compute"):
+                        # Operating on only the selected vertices with `where` avoids creating temporary arrays of
+                        # the selected vertices
+                        selected_column = selected[:, np.newaxis]
+                        with buffer_pool.borrow((num_verts, 3), np.single) as movement:
+                            np.subtract(cos, relative_cos, out=movement)
+                            sum_movement += np.sum(movement, axis=0, dtype=np.double, where=selected_column)
+                            if not use_mean:
+                                # The movements of every mesh must be kept to be able to calculate the average
+                                movements.append(movement[selected])
+                        num_selected += np.count_nonzero(selected)
+                        if not use_mean:
+                            weights.append(self.get_weights(
+                                obj, relative_cos[selected], falloff_center,
+                                # Only read the vertex groups of the selected vertices
+                                lambda group_index: get_deform_weights(me, group_index,
+                                                                       vertex_indices=np.flatnonzero(selected))
+                            ))
+                    shapes_to_update.append((active_shape, cos, relative_cos, selected_column))
+
+                if num_selected:
+                    if use_mean:
+                        average_movement = (sum_movement / num_selected).astype(np.single)
+                    else:
+                        with phase("compute"):
+                            average_movement = self.get_average_movement(movements, weights)
+                        if average_movement is None:
+                            # Nothing has been changed, but 'CANCELLED' would stop the Redo Panel from undoing the
+                            # previous execution
+                            return {'FINISHED'}
+                        average_movement = average_movement.astype(np.single)
+                    for active_shape, cos, relative_cos, selected_column in shapes_to_update:
+                        with phase("compute"):
+                            if mix == 1.0:
+                                np.add(relative_cos, average_movement, out=cos, where=selected_column)
+                            else:
+                                # Equivalent to relative_co + movement.lerp(average_movement, mix), calculated as
+                                # relative_co + movement * (1 - mix) + average_movement * mix
+                                np.subtract(cos, relative_cos, out=cos, where=selected_column)
+                                np.multiply(cos, 1.0 - mix, out=cos, where=selected_column)
+                                np.add(cos, relative_cos, out=cos, where=selected_column)
+                                np.add(cos, average_movement * mix, out=cos, where=selected_column)
+                        with phase("write"):
+                            set_shape_key(active_shape, cos)
+            finally:
+                buffer_pool.release(*acquired)
 
         return {'FINISHED'}
 
@@ -509,6 +1071,8 @@ class ActiveVertexMovementToSelected(OperatorBase):
 _register_classes, _unregister_classes = bpy.utils.register_classes_factory((
     ClearPendingChanges,
     TransferPendingChanges,
+    ShapeKeyWeight,
+    TransferPendingChangesMulti,
     AverageShapeKeyMovement,
     ActiveVertexMovementToSelected,
 ))
@@ -519,6 +1083,7 @@ def draw_to_menu(self: bpy.types.Menu, context):
     layout.separator()
     layout.operator(ClearPendingChanges.bl_idname)
     layout.operator(TransferPendingChanges.bl_idname)
+    layout.operator(TransferPendingChangesMulti.bl_idname)
     layout.operator(AverageShapeKeyMovement.bl_idname)
     layout.operator(ActiveVertexMovementToSelected.bl_idname)
 
@@ -0,0 +1,259 @@
+"""
+Shared NumPy access to mesh data for the addons in this folder.
+
+This is not an addon itself. Addons that import it need it installed alongside them (in the same addons folder).
+
+foreach_get/foreach_set only copy directly to/from a NumPy array when the array is C-contiguous and its dtype matches how Blender stores the data
+internally, otherwise Blender falls back to converting every value through a Python object. Every getter here returns an array with the
+internal dtype of the data, shaped (num_elements, components). An existing array can be passed as `out` to read into it instead of allocating a
+new array, so that an operator can reuse its arrays across meshes, shape keys and UV Maps.
+
+buffer_pool keeps the arrays released by operators so that calling an operator repeatedly, or on many meshes in a batch, re-uses the same
+memory instead of allocating new arrays every time:
+    with buffer_pool.borrow((num_verts, 3), np.single) as cos:
+        get_shape_key(shape_key, out=cos)
+        ...
+An array borrowed from the pool must not be used after it has been returned, so only borrow arrays that don't outlive the operator's execution.
+
+object_mode_round_trip temporarily switches to Object mode for bulk access to the meshes in Edit mode:
+    with object_mode_round_trip():
+        select = get_selection(me)
+        ...
+
+profile_execute and phase are re-exported from OperatorProfiling.py when it is installed, otherwise they do nothing, so that addons can
+support profiling without each needing their own fallback for when OperatorProfiling.py isn't installed.
+
+Internal dtypes:
+    Positions, shape key and UV coordinates: np.single (float32)
+    Selection and hidden states: bool
+    Vertex group indices: np.intc (int32)
+    Vertex group weights: np.single (float32)
+"""
+
+import bpy
+import numpy as np
+from contextlib import contextmanager, nullcontext
+from math import prod
+
+try:
+    # Optional, see OperatorProfiling.py
+    from OperatorProfiling import profile_execute, phase
+except ImportError:
+    def profile_execute(execute):
+        return execute
+
+    def phase(_name):
+        return nullcontext()
+
+# Blender 3.5 moved positions and UV coordinates into generic attributes. The old properties still exist, but access them through a slower,
+# compatibility path
+_use_attributes = bpy.app.version >= (3, 5)
+
+# Domain name to the name of the Mesh collection of that domain
+_domain_collections = {
+    'VERTEX': 'vertices',
+    'EDGE': 'edges',
+    'FACE': 'polygons',
+}
+
+
+class BufferPool:
+    """Pool of released arrays keyed by (dtype, number of elements). When the released arrays total more than max_bytes, the arrays of the least
+    recently used keys are discarded"""
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.num_bytes = 0
+        # {(dtype, length): [released 1D arrays]}, dicts keep insertion order, so the least recently used key is always first
+        self._free = {}
+
+    def acquire(self, shape, dtype):
+        """Get an uninitialised C-contiguous array of the specified shape and dtype"""
+        dtype = np.dtype(dtype)
+        shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        key = (dtype, prod(shape))
+        arrays = self._free.pop(key, None)
+        if not arrays:
+            return np.empty(shape, dtype=dtype)
+        array = arrays.pop()
+        self.num_bytes -= array.nbytes
+        if arrays:
+            # (Re-)insert as the most recently used key
+            self._free[key] = arrays
+        return array.reshape(shape)
+
+    def release(self, *arrays):
+        """Return arrays from acquire to the pool, the arrays must not be used afterwards"""
+        for array in arrays:
+            # Pool the whole 1D array that reshaped views were made from
+            while isinstance(array.base, np.ndarray):
+                array = array.base
+            if array.nbytes > self.max_bytes or not array.flags.c_contiguous:
+                continue
+            key = (array.dtype, array.size)
+            self._free.setdefault(key, []).append(array.reshape(-1))
+            self._free[key] = self._free.pop(key)
+            self.num_bytes += array.nbytes
+        while self.num_bytes > self.max_bytes:
+            oldest_key = next(iter(self._free))
+            oldest_arrays = self._free[oldest_key]
+            self.num_bytes -= oldest_arrays.pop().nbytes
+            if not oldest_arrays:
+                del self._free[oldest_key]
+
+    @contextmanager
+    def borrow(self, shape, dtype):
+        """Acquire an array for the duration of a with statement"""
+        array = self.acquire(shape, dtype)
+        try:
+            yield array
+        finally:
+            self.release(array)
+
+    def clear(self):
+        self._free.clear()
+        self.num_bytes = 0
+
+
+# Shared by all the addons
+buffer_pool = BufferPool()
+
+
+@contextmanager
+def object_mode_round_trip(mode='EDIT'):
+    """Temporarily switch to Object mode so that mesh data can be read and written in bulk with foreach_get/foreach_set, switching back to mode
+    afterwards, even if an exception is raised. Leaving Edit mode writes every mesh in Edit mode to its mesh data, including pending shape key
+    changes, and re-entering Edit mode loads the mesh data back into the edit meshes. Does nothing when mode is 'OBJECT'"""
+    if mode == 'OBJECT':
+        yield
+        return
+    with phase("update"):
+        bpy.ops.object.mode_set(mode='OBJECT')
+    try:
+        yield
+    finally:
+        with phase("update"):
+            bpy.ops.object.mode_set(mode=mode)
+
+
+def _get_out(out, num_elements, components, dtype):
+    """Get a C-contiguous array of shape (num_elements, components), or (num_elements,) when components is 1, to read into"""
+    shape = (num_elements,) if components == 1 else (num_elements, components)
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if out.shape != shape or out.dtype != dtype or not out.flags.c_contiguous:
+        raise ValueError(f"out must be a C-contiguous array of shape {shape} and dtype {np.dtype(dtype)}, but has shape {out.shape} and dtype"
+                         f" {out.dtype}")
+    return out
+
+
+def get_positions(me, out=None):
+    """Get the vertex positions of a mesh as an (num_verts, 3) np.single array"""
+    num_verts = len(me.vertices)
+    out = _get_out(out, num_verts, 3, np.single)
+    if _use_attributes:
+        me.attributes["position"].data.foreach_get("vector", out.ravel())
+    else:
+        me.vertices.foreach_get("co", out.ravel())
+    return out
+
+
+def set_positions(me, positions):
+    """Set the vertex positions of a mesh from an array of num_verts * 3 np.single values.
+    The mesh isn't updated, call me.update() once done"""
+    positions = np.ascontiguousarray(positions, dtype=np.single).ravel()
+    if _use_attributes:
+        me.attributes["position"].data.foreach_set("vector", positions)
+    else:
+        me.vertices.foreach_set("co", positions)
+
+
+def get_shape_key(shape_key, out=None):
+    """Get the coordinates of a shape key as an (num_verts, 3) np.single array"""
+    out = _get_out(out, len(shape_key.data), 3, np.single)
+    shape_key.data.foreach_get("co", out.ravel())
+    return out
+
+
+def set_shape_key(shape_key, cos):
+    """Set the coordinates of a shape key from an array of num_verts * 3 np.single values"""
+    shape_key.data.foreach_set("co", np.ascontiguousarray(cos, dtype=np.single).ravel())
+
+
+def get_uv_layer(uv_layer, out=None):
+    """Get the UV coordinates of a UV Map as an (num_loops, 2) np.single array"""
+    out = _get_out(out, len(uv_layer.data), 2, np.single)
+    if _use_attributes:
+        uv_layer.uv.foreach_get("vector", out.ravel())
+    else:
+        uv_layer.data.foreach_get("uv", out.ravel())
+    return out
+
+
+def set_uv_layer(uv_layer, uvs):
+    """Set the UV coordinates of a UV Map from an array of num_loops * 2 np.single values"""
+    uvs = np.ascontiguousarray(uvs, dtype=np.single).ravel()
+    if _use_attributes:
+        uv_layer.uv.foreach_set("vector", uvs)
+    else:
+        uv_layer.data.foreach_set("uv", uvs)
+
+
+def get_selection(me, domain='VERTEX', out=None):
+    """Get the selection state of each vertex, edge or face ('VERTEX', 'EDGE' or 'FACE') of a mesh in Object mode as a bool array"""
+    collection = getattr(me, _domain_collections[domain])
+    out = _get_out(out, len(collection), 1, bool)
+    collection.foreach_get("select", out)
+    return out
+
+
+def get_hidden(me, domain='VERTEX', out=None):
+    """Get the hidden state of each vertex, edge or face ('VERTEX', 'EDGE' or 'FACE') of a mesh in Object mode as a bool array"""
+    collection = getattr(me, _domain_collections[domain])
+    out = _get_out(out, len(collection), 1, bool)
+    collection.foreach_get("hide", out)
+    return out
+
+
+def get_vertex_group_arrays(me, vertex_indices=None):
+    """Read the vertex groups of every vertex of a mesh in Object mode into flat, CSR-like arrays.
+
+    Returns (offsets, group_indices, weights), where the vertex groups of vertex i are
+    group_indices[offsets[i]:offsets[i + 1]] with weights weights[offsets[i]:offsets[i + 1]].
+    When vertex_indices is specified, only the vertices at those indices are read and i is the position in vertex_indices"""
+    if vertex_indices is None:
+        vertices = me.vertices
+    else:
+        all_vertices = me.vertices
+        vertices = [all_vertices[i] for i in vertex_indices.tolist()]
+    num_verts = len(vertices)
+    offsets = np.zeros(num_verts + 1, dtype=np.intc)
+    np.cumsum(np.fromiter((len(v.groups) for v in vertices), dtype=np.intc, count=num_verts), out=offsets[1:])
+    num_elements = offsets[-1]
+    group_indices = np.empty(num_elements, dtype=np.intc)
+    weights = np.empty(num_elements, dtype=np.single)
+    # There's no way to get the groups of all vertices at once, but getting all the groups of each vertex at once is much
+    # faster than accessing each group individually
+    for v, start, end in zip(vertices, offsets[:-1].tolist(), offsets[1:].tolist()):
+        if start != end:
+            groups = v.groups
+            groups.foreach_get('group', group_indices[start:end])
+            groups.foreach_get('weight', weights[start:end])
+    return offsets, group_indices, weights
+
+
+def get_deform_weights(me, group_index, out=None, vertex_group_arrays=None, vertex_indices=None):
+    """Get the weight of each vertex in the vertex group with index group_index as a np.single array, vertices not in the group have a weight of
+    zero. The arrays from get_vertex_group_arrays can be passed as vertex_group_arrays to avoid reading them again.
+    Reading the vertex groups needs a Python step per vertex, so when only some vertices are needed, pass their indices as vertex_indices to only
+    read and return the weights of those vertices"""
+    num_verts = len(me.vertices) if vertex_indices is None else len(vertex_indices)
+    out = _get_out(out, num_verts, 1, np.single)
+    out.fill(0)
+    if vertex_group_arrays is None:
+        vertex_group_arrays = get_vertex_group_arrays(me, vertex_indices)
+    offsets, group_indices, weights = vertex_group_arrays
+    in_group = group_indices == group_index
+    # The vertex each element belongs to
+    element_vertices = np.repeat(np.arange(num_verts, dtype=np.intc), np.diff(offsets))
+    out[element_vertices[in_group]] = weights[in_group]
+    return out
@@ -0,0 +1,134 @@
+"""
+Shared profiling helpers for the addons in this folder.
+
+This is not an addon itself. Install it alongside the addons (in the same addons folder) to be able to profile them, addons that support
+profiling work the same without it.
+
+Profiling is disabled by default. Enable it either with environment variables before starting Blender:
+    MYSTERYEM_PROFILE=1          Time the phases of each profiled operator
+    MYSTERYEM_PROFILE=cprofile   Also capture a cProfile of each profiled operator
+    MYSTERYEM_PROFILE_LOG=path   Append a JSON line with the timings of each execution to this file (cProfile stats are saved next to it)
+or from Python, e.g. the Python Console:
+    import OperatorProfiling; OperatorProfiling.configure(enabled=True, use_cprofile=False, log_path=None)
+
+When enabled, a summary of the phase timings of each execution is reported to the Info log.
+
+Usage in an addon:
+    class MyOperator(bpy.types.Operator):
+        @profile_execute
+        def execute(self, context):
+            with phase("fetch"):
+                ...
+            with phase("compute"):
+                ...
+"""
+
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import time
+from contextlib import contextmanager
+
+_enabled = os.environ.get("MYSTERYEM_PROFILE", "") not in ("", "0")
+_use_cprofile = os.environ.get("MYSTERYEM_PROFILE", "").lower() == "cprofile"
+_log_path = os.environ.get("MYSTERYEM_PROFILE_LOG") or None
+
+# Profilers of the operators currently executing, the last one is the innermost
+_active_profilers = []
+
+
+def configure(enabled=True, use_cprofile=False, log_path=None):
+    global _enabled, _use_cprofile, _log_path
+    _enabled = enabled
+    _use_cprofile = use_cprofile
+    _log_path = log_path
+
+
+class PhaseProfiler:
+    def __init__(self, name):
+        self.name = name
+        # Phase name to total seconds, in the order the phases were first entered
+        self.phases = {}
+        self.total = 0.0
+        self.stats = None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def run(self, func, *args):
+        profile = cProfile.Profile() if _use_cprofile else None
+        start = time.perf_counter()
+        try:
+            if profile:
+                return profile.runcall(func, *args)
+            return func(*args)
+        finally:
+            self.total = time.perf_counter() - start
+            if profile:
+                self.stats = pstats.Stats(profile)
+
+    def summary(self):
+        accounted = sum(self.phases.values())
+        phases = [f"{name} {seconds:.4f}s" for name, seconds in self.phases.items()]
+        if self.phases:
+            phases.append(f"other {self.total - accounted:.4f}s")
+        return f"{self.name}: {self.total:.4f}s" + (f" ({', '.join(phases)})" if phases else "")
+
+    def write_log(self, log_path, result):
+        entry = {
+            "operator": self.name,
+            "time": time.time(),
+            "result": sorted(result) if isinstance(result, set) else None,
+            "total_seconds": self.total,
+            "phases": self.phases,
+        }
+        with open(log_path, "a", encoding='utf-8') as f:
+            f.write(json.dumps(entry) + "\n")
+        if self.stats:
+            self.stats.dump_stats(f"{log_path}.{self.name}.{int(entry['time'] * 1000)}.prof")
+
+    def print_stats(self, limit=20):
+        if self.stats:
+            stream = io.StringIO()
+            self.stats.stream = stream
+            self.stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+            print(stream.getvalue())
+
+
+@contextmanager
+def phase(name):
+    """Time a phase of the innermost profiled operator, does nothing when profiling is disabled"""
+    if _active_profilers:
+        with _active_profilers[-1].phase(name):
+            yield
+    else:
+        yield
+
+
+def profile_execute(execute):
+    """Decorator for Operator.execute that times its phases when profiling is enabled"""
+    @functools.wraps(execute)
+    def wrapper(self, context):
+        if not _enabled:
+            return execute(self, context)
+        profiler = PhaseProfiler(self.bl_idname)
+        _active_profilers.append(profiler)
+        try:
+            result = profiler.run(execute, self, context)
+        finally:
+            _active_profilers.pop()
+        self.report({'INFO'}, profiler.summary())
+        if _log_path:
+            profiler.write_log(_log_path, result)
+        else:
+            profiler.print_stats()
+        return result
+    return wrapper
@@ -1,7 +1,7 @@
 bl_info = {
     "name": "Select All By Trait: Number Of Vertex Groups",
     "author": "Mysteryem",
-    "version": (1, 0, 1),
+    "version": (1, 4, 0),
     "blender": (2, 93, 7),  # Older versions have not been tested
     "location": "Select > Select All By Trait > Number of Vertex Groups",
     "tracker_url": "https://github.com/Mysteryem/Miscellaneous/issues",
@@ -18,10 +18,76 @@ For VRChat, this limit is 4.
 Additionally, Unity's default Model Import Settings only import up to 4 skin weights per vertex.
 
 When there are more than the maximum number of skin weights, the lowest weighted bones are discarded.
+
+The NumPy engine briefly switches to Object mode so that the vertex groups of every vertex can be read into flat arrays
+and the new selection can be set all at once, which is much faster on meshes with many vertices.
+
+Also adds a Limit Total (Fast) operator to the Vertex Group Specials menu that does the same as Limit Total
+(bpy.ops.object.vertex_group_limit_total), from the same flat arrays, for the same subsets of vertex groups. It can
+optionally normalize the remaining weights of the vertices that had weights removed and has a Dry Run option that only
+reports how much weight would be discarded and selects the vertices that would have weights removed.
+
+Also adds a Vertex Group Influences panel to the sidebar in Edit mode that shows how many vertices have each number of
+vertex groups, across all the meshes in Edit mode, with a button to select the vertices with each number. The histogram
+is kept until the meshes change.
+
+Also adds a Vertex Group Audit panel to the sidebar in Object mode that audits every skinned mesh in the scene at once,
+listing how many vertices of each mesh are over the limit, the most vertex groups of any vertex and how much weight
+limiting would discard. The vertex groups are read on the main thread while the counting is done on a thread pool. The
+audit can also be run on many .blend files with batchRunOperators.py by setting Report Path.
 """
 
 import bpy
 import bmesh
+import json
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from bpy.app.handlers import persistent
+
+# Uses MeshDataAccess.py when it's installed alongside this addon. Otherwise, minimal versions of the functions are
+# defined here so that this addon also works when installed on its own or run from the Text Editor, just without
+# re-using arrays or the faster attribute access of Blender 3.5+
+try:
+    from MeshDataAccess import get_vertex_group_arrays, get_selection, get_hidden, object_mode_round_trip
+except ImportError:
+    from contextlib import contextmanager
+
+    @contextmanager
+    def object_mode_round_trip(mode='EDIT'):
+        if mode == 'OBJECT':
+            yield
+            return
+        bpy.ops.object.mode_set(mode='OBJECT')
+        try:
+            yield
+        finally:
+            bpy.ops.object.mode_set(mode=mode)
+
+    def _get_flags(me, domain, prop, out):
+        collection = getattr(me, {'VERTEX': 'vertices', 'EDGE': 'edges', 'FACE': 'polygons'}[domain])
+        if out is None:
+            out = np.empty(len(collection), dtype=bool)
+        collection.foreach_get(prop, out)
+        return out
+
+    def get_selection(me, domain='VERTEX', out=None):
+        return _get_flags(me, domain, "select", out)
+
+    def get_hidden(me, domain='VERTEX', out=None):
+        return _get_flags(me, domain, "hide", out)
+
+    def get_vertex_group_arrays(me, vertex_indices=None):
+        vertices = me.vertices if vertex_indices is None else [me.vertices[i] for i in vertex_indices.tolist()]
+        offsets = np.zeros(len(vertices) + 1, dtype=np.intc)
+        np.cumsum(np.fromiter((len(v.groups) for v in vertices), dtype=np.intc, count=len(vertices)), out=offsets[1:])
+        group_indices = np.empty(offsets[-1], dtype=np.intc)
+        weights = np.empty(offsets[-1], dtype=np.single)
+        for v, start, end in zip(vertices, offsets[:-1].tolist(), offsets[1:].tolist()):
+            if start != end:
+                v.groups.foreach_get('group', group_indices[start:end])
+                v.groups.foreach_get('weight', weights[start:end])
+        return offsets, group_indices, weights
 
 # type constants
 _not_equal_id = 'NOT_EQUAL'
@@ -32,17 +98,159 @@ _less_than_id = 'LESS_THAN'
 _subset_all = 'ALL'
 _subset_deform = 'BONE_DEFORM'
 _subset_other = 'OTHER_DEFORM'
+_subset_items = (
+    (_subset_all, "All Groups", "All Vertex Groups"),
+    (_subset_deform, "Deform Pose Bones", "All Vertex Groups assigned to Deform Pose Bones"),
+    (_subset_other, "Other", "All Vertex Groups not assigned to Deform Pose Bones"),
+)
+# engine constants
+_engine_bmesh = 'BMESH'
+_engine_numpy = 'NUMPY'
+
+# Deform indices of each Object from the last time they were found, {object name: (signature, deform indices)}
+_deform_indices_cache = {}
+
+# Histograms of the number of vertex groups per vertex of the meshes in Edit mode,
+# {(object names, subset, ignore_zero): [histogram, whether the meshes have changed since it was calculated]}
+_histogram_cache = {}
+# Calculating a histogram causes geometry updates of its own, which mustn't mark the histogram as outdated
+_ignore_geometry_updates = False
 
 
-def get_deform_indices(obj):
+def get_deform_indices_signature(obj):
+    """Cheap signature of everything get_deform_indices depends on, other than the Deform setting of each bone"""
+    armatures = tuple((mod.name, mod.object.name, len(mod.object.pose.bones)) for mod in obj.modifiers
+                      if mod.type == 'ARMATURE' and mod.object and mod.show_viewport)
+    return armatures, tuple(vg.name for vg in obj.vertex_groups)
+
+
+def get_deform_indices(obj, use_cache=False):
+    """Get the indices of the vertex groups of obj that are assigned to deform bones of its armature modifiers.
+    With use_cache, the indices from the last call are re-used if the armature modifiers, their number of bones and the vertex
+    groups haven't changed. The signature can't see changes to the Deform setting of bones, so only use the cache when nothing
+    else can have changed, such as when an operator is re-executed from the Redo Panel"""
+    signature = get_deform_indices_signature(obj)
+    if use_cache:
+        cached = _deform_indices_cache.get(obj.name)
+        if cached and cached[0] == signature:
+            return set(cached[1])
     vg_names_to_indices = {vg.name: i for i, vg in enumerate(obj.vertex_groups)}
     valid_mod_bones_gen = (mod.object.pose.bones for mod in obj.modifiers if mod.type == 'ARMATURE' and mod.object and mod.show_viewport)
     all_bones_gen = (pose_bone.bone for pose_bones in valid_mod_bones_gen for pose_bone in pose_bones)
     deform_bones_only = filter(lambda bone: bone.use_deform and bone.name in vg_names_to_indices, all_bones_gen)
     deform_indices = {vg_names_to_indices[bone.name] for bone in deform_bones_only}
+    _deform_indices_cache[obj.name] = (signature, frozenset(deform_indices))
     return deform_indices
 
 
+def get_subset_indices(obj, subset, use_cache=False):
+    """Get the indices of the vertex groups in a subset or None if the subset is all vertex groups"""
+    if subset == _subset_deform:
+        return get_deform_indices(obj, use_cache)
+    elif subset == _subset_other:
+        return {i for i in range(len(obj.vertex_groups))} - get_deform_indices(obj, use_cache)
+    return None
+
+
+def get_element_vertices(offsets):
+    """Get the index of the vertex each element of CSR-like arrays from get_vertex_group_arrays belongs to"""
+    return np.repeat(np.arange(len(offsets) - 1, dtype=np.intc), np.diff(offsets))
+
+
+def count_per_vertex(offsets, element_mask):
+    """Count the True elements of element_mask belonging to each vertex of CSR-like arrays from get_vertex_group_arrays"""
+    starts = offsets[:-1]
+    counts = np.zeros(len(starts), dtype=np.intc)
+    # np.add.reduceat gives the element at the start index, rather than zero, for empty segments and doesn't accept a
+    # start index equal to the length of the array, so only reduce the vertices that have at least one group
+    not_empty = starts != offsets[1:]
+    if not_empty.any():
+        counts[not_empty] = np.add.reduceat(element_mask.astype(np.intc), starts[not_empty])
+    return counts
+
+
+def find_limit_total_removals(offsets, weights, element_vertices, counted, limit):
+    """Find the counted elements of CSR-like arrays from get_vertex_group_arrays that would be removed by limiting each vertex
+    to `limit` counted elements, keeping the highest weights like bpy.ops.object.vertex_group_limit_total.
+    Returns the indices of the elements to remove"""
+    counted_elements = np.flatnonzero(counted)
+    # Sort the counted elements by vertex and then by descending weight. lexsort is stable, so equal weights keep their
+    # current order
+    order = np.lexsort((-weights[counted_elements], element_vertices[counted_elements]))
+    sorted_elements = counted_elements[order]
+    # The rank of each sorted element within its vertex, 0 being the highest weight
+    counts = count_per_vertex(offsets, counted)
+    first = np.cumsum(counts) - counts
+    rank = np.arange(len(sorted_elements)) - np.repeat(first, counts)
+    return sorted_elements[rank >= limit]
+
+
+def get_counted_mask(obj, group_indices, subset_indices):
+    """Get whether each element of CSR-like arrays from get_vertex_group_arrays is in the subset of vertex groups"""
+    if subset_indices is None:
+        return np.ones(len(group_indices), dtype=bool)
+    # Lookup table of whether each vertex group index is in the subset
+    in_subset = np.zeros(len(obj.vertex_groups), dtype=bool)
+    in_subset[list(subset_indices)] = True
+    return in_subset[group_indices]
+
+
+def get_group_counts(obj, subset_indices, ignore_zero):
+    """Count the vertex groups in the subset of each vertex of a mesh in Object mode"""
+    me = obj.data
+    if subset_indices is not None and not subset_indices:
+        # If subset_indices is not None, but is empty, then no groups are counted
+        return np.zeros(len(me.vertices), dtype=np.intc)
+    offsets, group_indices, weights = get_vertex_group_arrays(me)
+    counted = get_counted_mask(obj, group_indices, subset_indices)
+    if ignore_zero:
+        counted &= weights != 0
+    return count_per_vertex(offsets, counted)
+
+
+def audit_vertex_group_arrays(offsets, weights, counted, limit):
+    """Audit CSR-like arrays from get_vertex_group_arrays against a limit of counted elements per vertex.
+    Only uses NumPy, so can be run on other threads"""
+    counts = count_per_vertex(offsets, counted)
+    element_vertices = get_element_vertices(offsets)
+    removed = find_limit_total_removals(offsets, weights, element_vertices, counted, limit)
+    discarded = np.bincount(element_vertices[removed], weights=weights[removed], minlength=len(counts))
+    return {
+        "vertices": len(counts),
+        "over_limit": int(np.count_nonzero(counts > limit)),
+        "max_influences": int(counts.max(initial=0)),
+        "max_discarded": float(discarded.max(initial=0)),
+        "total_discarded": float(discarded.sum()),
+    }
+
+
+def flush_vertex_selection(me, vert_select):
+    """Set the vertex selection of a mesh in Object mode and flush it to edges and faces like Vertex select mode does"""
+    me.vertices.foreach_set('select', vert_select)
+
+    edges = me.edges
+    if edges:
+        num_edges = len(edges)
+        edge_verts = np.empty(num_edges * 2, dtype=np.intc)
+        edges.foreach_get('vertices', edge_verts)
+        edge_hide = get_hidden(me, 'EDGE')
+        edge_select = vert_select[edge_verts].reshape(-1, 2).all(axis=1)
+        edge_select &= ~edge_hide
+        edges.foreach_set('select', edge_select)
+
+    polygons = me.polygons
+    if polygons:
+        num_polygons = len(polygons)
+        loop_verts = np.empty(len(me.loops), dtype=np.intc)
+        me.loops.foreach_get('vertex_index', loop_verts)
+        loop_starts = np.empty(num_polygons, dtype=np.intc)
+        polygons.foreach_get('loop_start', loop_starts)
+        polygon_hide = get_hidden(me, 'FACE')
+        polygon_select = np.logical_and.reduceat(vert_select[loop_verts], loop_starts)
+        polygon_select &= ~polygon_hide
+        polygons.foreach_set('select', polygon_select)
+
+
 # pre-3.0 support
 class OperatorMixin:
     # poll_message_set was added in 3.0
@@ -79,11 +287,7 @@ class MYSTERYEM_select_all_my_trait_number_vertex_groups(OperatorMixin, bpy.type
     
     subset: bpy.props.EnumProperty(
         name="Subset",
-        items=(
-            (_subset_all, "All Groups", "All Vertex Groups"),
-            (_subset_deform, "Deform Pose Bones", "All Vertex Groups assigned to Deform Pose Bones"),
-            (_subset_other, "Other", "All Vertex Groups not assigned to Deform Pose Bones"),
-        ),
+        items=_subset_items,
         default=_subset_deform,  # Default intended for VRChat usage where there is a max of 4 deform groups per vertex
         description="Define which subset of groups shall be used",
     )
@@ -99,6 +303,17 @@ class MYSTERYEM_select_all_my_trait_number_vertex_groups(OperatorMixin, bpy.type
         description="Extend the selection",
     )
     
+    engine: bpy.props.EnumProperty(
+        name="Engine",
+        items=(
+            (_engine_bmesh, "BMesh", "Check the vertices of the edit meshes one at a time"),
+            (_engine_numpy, "NumPy", "Switch to Object mode and check all the vertices at once. Much faster on meshes with"
+                                     " many vertices"),
+        ),
+        default=_engine_bmesh,
+        description="How the vertex groups should be counted and the selection set",
+    )
+    
     @classmethod
     def poll(cls, context):
         # Using objects_in_mode_unique_data to support multi-object editing
@@ -122,6 +337,13 @@ class MYSTERYEM_select_all_my_trait_number_vertex_groups(OperatorMixin, bpy.type
         type = self.type
         ignore_zero = self.ignore_zero
         subset = self.subset
+        # When adjusting properties in the Redo Panel, the bones can't have changed, so the deform indices can be re-used
+        use_cache = self.options.is_repeat
+        # Only the selection changes, so any histograms are still up-to-date
+        ignore_geometry_updates()
+        
+        if self.engine == _engine_numpy:
+            return self.execute_numpy(context)
         
         for obj in context.objects_in_mode_unique_data:
             # Skip objects without vertex groups, mirroring the behaviour of bpy.ops.mesh.select_ungrouped
@@ -138,11 +360,7 @@ class MYSTERYEM_select_all_my_trait_number_vertex_groups(OperatorMixin, bpy.type
                     # be getting the bmesh edit mesh anyway, it would be wasteful to usually do both
                     continue
                 
-                subset_indices = None
-                if subset == _subset_deform:
-                    subset_indices = get_deform_indices(obj)
-                elif subset == _subset_other:
-                    subset_indices = {i for i in range(len(obj.vertex_groups))} - get_deform_indices(obj)
+                subset_indices = get_subset_indices(obj, subset, use_cache)
             
                 deform_layer = bm.verts.layers.deform.active
                 if deform_layer and (subset_indices is None or subset_indices):
@@ -228,19 +446,549 @@ class MYSTERYEM_select_all_my_trait_number_vertex_groups(OperatorMixin, bpy.type
                 # Update the edit_mesh for the selection changes
                 bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
         return {'FINISHED'}
+    
+    def execute_numpy(self, context):
+        number = self.number
+        extend = self.extend
+        type = self.type
+        ignore_zero = self.ignore_zero
+        subset = self.subset
+        # When adjusting properties in the Redo Panel, the bones can't have changed, so the deform indices can be re-used
+        use_cache = self.options.is_repeat
+        
+        # Skip objects without vertex groups, mirroring the behaviour of bpy.ops.mesh.select_ungrouped
+        objects = [obj for obj in context.objects_in_mode_unique_data if obj.vertex_groups]
+        
+        # Leaving edit mode writes the edit meshes to the mesh data so that it can be accessed in bulk
+        with object_mode_round_trip():
+            for obj in objects:
+                me = obj.data
+                vertices = me.vertices
+                num_verts = len(vertices)
+                
+                if extend and me.total_vert_sel == num_verts:
+                    # With extend enabled, if all the vertices are already selected, there's nothing to do
+                    continue
+                
+                subset_indices = get_subset_indices(obj, subset, use_cache)
+                group_count = get_group_counts(obj, subset_indices, ignore_zero)
+                
+                if type == _greater_than_id:
+                    matches = group_count > number
+                elif type == _not_equal_id:
+                    matches = group_count != number
+                elif type == _equal_to_id:
+                    matches = group_count == number
+                else:  # elif type == _less_than_id
+                    matches = group_count < number
+                
+                select = get_selection(me)
+                # Hidden vertices keep their current selection
+                hide = get_hidden(me)
+                matches &= ~hide
+                if extend:
+                    select |= matches
+                else:
+                    select = np.where(hide, select, matches)
+                
+                flush_vertex_selection(me, select)
+        return {'FINISHED'}
+
+class MYSTERYEM_vertex_group_limit_total(OperatorMixin, bpy.types.Operator):
+    """Limit the number of vertex groups per vertex, removing the lowest weights, for all the vertices at once"""
+    bl_idname = 'mysteryem.vertex_group_limit_total'
+    bl_label = "Limit Total (Fast)"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    limit: bpy.props.IntProperty(
+        name="Limit",
+        min=1,
+        max=32,
+        default=4,  # Default intended for VRChat usage where there is a max of 4 deform groups per vertex
+        description="Maximum number of vertex groups per vertex",
+    )
+    
+    subset: bpy.props.EnumProperty(
+        name="Subset",
+        items=_subset_items,
+        default=_subset_deform,  # Default intended for VRChat usage where there is a max of 4 deform groups per vertex
+        description="Define which subset of groups shall be limited",
+    )
+    
+    normalize: bpy.props.BoolProperty(
+        name="Normalize",
+        default=True,
+        description="Normalize the remaining weights in the subset of the vertices that had weights removed",
+    )
+    
+    only_selected: bpy.props.BoolProperty(
+        name="Only Selected",
+        description="Only limit the selected vertices",
+    )
+    
+    dry_run: bpy.props.BoolProperty(
+        name="Dry Run",
+        description="Only report how much weight would be discarded and select the vertices that would have weights"
+                    " removed, without changing any vertex groups",
+    )
+    
+    @staticmethod
+    def get_objects(context):
+        if context.mode == 'EDIT_MESH':
+            objects = context.objects_in_mode_unique_data
+        else:
+            objects = context.selected_objects
+            if context.object and context.object not in objects:
+                objects = objects + [context.object]
+        # Only one Object of each mesh, otherwise the same weights would be limited more than once
+        unique_data = {obj.data: obj for obj in objects if obj.type == 'MESH' and obj.vertex_groups}
+        return list(unique_data.values())
+    
+    @classmethod
+    def poll(cls, context):
+        if context.mode not in {'OBJECT', 'EDIT_MESH', 'PAINT_WEIGHT'}:
+            cls.poll_message_set("Must be in Object, Edit or Weight Paint mode")
+            return False
+        if not cls.get_objects(context):
+            cls.poll_message_set("No meshes with weights/vertex groups")
+            return False
+        return True
+    
+    def execute(self, context):
+        objects = self.get_objects(context)
+        in_edit_mode = context.mode == 'EDIT_MESH'
+        # When adjusting properties in the Redo Panel, the bones can't have changed, so the deform indices can be re-used
+        use_cache = self.options.is_repeat
+        if self.dry_run:
+            # Only the selection changes, so any histograms are still up-to-date
+            ignore_geometry_updates()
+        
+        num_removed = 0
+        num_affected_vertices = 0
+        total_discarded = 0.0
+        max_discarded = 0.0
+        # Leaving edit mode writes the edit meshes to the mesh data so that it can be accessed in bulk
+        with object_mode_round_trip('EDIT' if in_edit_mode else 'OBJECT'):
+            for obj in objects:
+                me = obj.data
+                num_verts = len(me.vertices)
+                subset_indices = get_subset_indices(obj, self.subset, use_cache)
+                if subset_indices is not None and not subset_indices:
+                    if self.dry_run:
+                        # No vertices would have weights removed
+                        flush_vertex_selection(me, np.zeros(num_verts, dtype=bool))
+                    continue
+                
+                offsets, group_indices, weights = get_vertex_group_arrays(me)
+                element_vertices = get_element_vertices(offsets)
+                counted = get_counted_mask(obj, group_indices, subset_indices)
+                if self.only_selected:
+                    selected = get_selection(me)
+                    selected &= ~get_hidden(me)
+                    counted &= selected[element_vertices]
+                
+                removed = find_limit_total_removals(offsets, weights, element_vertices, counted, self.limit)
+                if not len(removed):
+                    if self.dry_run:
+                        # No vertices would have weights removed
+                        flush_vertex_selection(me, np.zeros(num_verts, dtype=bool))
+                    continue
+                
+                removed_vertices = element_vertices[removed]
+                discarded = np.bincount(removed_vertices, weights=weights[removed], minlength=num_verts)
+                affected = np.zeros(num_verts, dtype=bool)
+                affected[removed_vertices] = True
+                num_removed += len(removed)
+                num_affected_vertices += np.count_nonzero(affected)
+                total_discarded += discarded.sum()
+                max_discarded = max(max_discarded, discarded.max())
+                if self.dry_run:
+                    # Select the vertices that would have weights removed so that they can be inspected
+                    affected &= ~get_hidden(me)
+                    flush_vertex_selection(me, affected)
+                    continue
+                
+                if self.normalize:
+                    kept = counted.copy()
+                    kept[removed] = False
+                    normalized = kept & affected[element_vertices]
+                    normalized_vertices = element_vertices[normalized]
+                    sums = np.bincount(normalized_vertices, weights=weights[normalized], minlength=num_verts)
+                    # Vertices whose remaining weights are all zero can't be normalized
+                    normalized &= (sums > 0)[element_vertices]
+                    new_weights = weights.copy()
+                    new_weights[normalized] /= sums[element_vertices[normalized]]
+                    # There's no way to set the weights of all vertices at once, so set all the weights of each affected
+                    # vertex at once. This must be done before removing, which changes the order of the groups of a vertex
+                    vertices = me.vertices
+                    for v_index in np.flatnonzero(affected & (sums > 0)).tolist():
+                        vertices[v_index].groups.foreach_set('weight', new_weights[offsets[v_index]:offsets[v_index + 1]])
+                
+                # Remove from each vertex group once, sorting the removed elements by vertex group
+                removed_groups = group_indices[removed]
+                order = np.argsort(removed_groups, kind='stable')
+                unique_groups, group_starts = np.unique(removed_groups[order], return_index=True)
+                vertex_groups = obj.vertex_groups
+                for group_index, group_vertices in zip(unique_groups.tolist(), np.split(removed_vertices[order], group_starts[1:])):
+                    vertex_groups[group_index].remove(group_vertices.tolist())
+        
+        if num_removed:
+            verb = "Would remove" if self.dry_run else "Removed"
+            selected = " (selected)" if self.dry_run else ""
+            self.report({'INFO'}, f"{verb} {num_removed} weights from {num_affected_vertices} vertices{selected}, discarding"
+                                  f" {total_discarded:.4f} total weight (at most {max_discarded:.4f} from a single vertex)")
+        else:
+            self.report({'INFO'}, "No vertices are over the limit")
+        return {'FINISHED'}
+
+
+class MYSTERYEM_vertex_group_histogram_settings(bpy.types.PropertyGroup):
+    subset: bpy.props.EnumProperty(
+        name="Subset",
+        items=_subset_items,
+        default=_subset_deform,  # Default intended for VRChat usage where there is a max of 4 deform groups per vertex
+        description="Define which subset of groups shall be counted",
+    )
+    
+    ignore_zero: bpy.props.BoolProperty(
+        default=True,  # Default intended for VRChat usage where there is a max of 4 deform groups per vertex
+        name="Ignore zero weight groups",
+        description="Don't count a vertex group the vertex is in if its weight in that vertex group is zero",
+    )
+
+
+def get_histogram_key(context):
+    settings = context.scene.mysteryem_vertex_group_histogram
+    object_names = tuple(sorted(obj.name for obj in context.objects_in_mode_unique_data))
+    return object_names, settings.subset, settings.ignore_zero
+
+
+def stop_ignoring_geometry_updates():
+    global _ignore_geometry_updates
+    _ignore_geometry_updates = False
+    # Don't repeat
+    return None
+
+
+def ignore_geometry_updates():
+    """Stop the next geometry updates from marking histograms as outdated, for operators that update the geometry without
+    changing the number of vertex groups of any vertex"""
+    global _ignore_geometry_updates
+    _ignore_geometry_updates = True
+    # The handler resets the flag, but there may not be any updates, in which case the flag is reset on the next event loop
+    # iteration
+    if not bpy.app.timers.is_registered(stop_ignoring_geometry_updates):
+        bpy.app.timers.register(stop_ignoring_geometry_updates, first_interval=0)
+
+
+class MYSTERYEM_vertex_group_histogram(OperatorMixin, bpy.types.Operator):
+    """Count how many vertices have each number of vertex groups, across all meshes in Edit mode"""
+    bl_idname = 'mysteryem.vertex_group_histogram'
+    bl_label = "Calculate Vertex Group Influences"
+    bl_options = {'REGISTER'}
+    
+    @classmethod
+    def poll(cls, context):
+        if context.mode != 'EDIT_MESH':
+            cls.poll_message_set("Must be in mesh edit mode")
+            return False
+        return True
+    
+    def execute(self, context):
+        settings = context.scene.mysteryem_vertex_group_histogram
+        histogram = np.zeros(1, dtype=np.int64)
+        # Skip objects without vertex groups, the same as the select operator does, so that selecting a bucket of the histogram
+        # selects the vertices it counted
+        for obj in context.objects_in_mode_unique_data:
+            if not obj.vertex_groups:
+                continue
+            # Write the edit mesh to the mesh data so that it can be accessed in bulk, without leaving Edit mode
+            obj.update_from_editmode()
+            subset_indices = get_subset_indices(obj, settings.subset)
+            object_histogram = np.bincount(get_group_counts(obj, subset_indices, settings.ignore_zero))
+            if len(object_histogram) > len(histogram):
+                histogram = np.pad(histogram, (0, len(object_histogram) - len(histogram)))
+            histogram[:len(object_histogram)] += object_histogram
+        _histogram_cache.clear()
+        _histogram_cache[get_histogram_key(context)] = [histogram.tolist(), False]
+        # Writing the edit meshes to the mesh data may cause geometry updates
+        ignore_geometry_updates()
+        
+        total = histogram.sum()
+        summary = ", ".join(f"{num_groups}: {count}" for num_groups, count in enumerate(histogram.tolist()) if count)
+        self.report({'INFO'}, f"Vertices by number of vertex groups ({total} vertices): {summary}")
+        return {'FINISHED'}
+
+
+@persistent
+def mark_histograms_outdated(scene, depsgraph):
+    global _ignore_geometry_updates
+    if _ignore_geometry_updates:
+        _ignore_geometry_updates = False
+        return
+    if not _histogram_cache:
+        return
+    for update in depsgraph.updates:
+        if update.is_updated_geometry and isinstance(update.id, (bpy.types.Object, bpy.types.Mesh)):
+            for cached in _histogram_cache.values():
+                cached[1] = True
+            return
+
+
+class MYSTERYEM_PT_vertex_group_histogram(bpy.types.Panel):
+    bl_idname = 'MYSTERYEM_PT_vertex_group_histogram'
+    bl_label = "Vertex Group Influences"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Item"
+    bl_context = 'mesh_edit'
+    bl_options = {'DEFAULT_CLOSED'}
+    
+    def draw(self, context):
+        layout = self.layout
+        settings = context.scene.mysteryem_vertex_group_histogram
+        layout.prop(settings, "subset", text="")
+        layout.prop(settings, "ignore_zero")
+        
+        cached = _histogram_cache.get(get_histogram_key(context))
+        layout.operator(MYSTERYEM_vertex_group_histogram.bl_idname, text="Recalculate" if cached else "Calculate", icon='FILE_REFRESH')
+        if not cached:
+            return
+        histogram, outdated = cached
+        if outdated:
+            layout.label(text="The meshes have changed", icon='ERROR')
+        
+        total = sum(histogram)
+        col = layout.column(align=True)
+        # Grey out outdated histograms, they can still be used for selecting
+        col.active = not outdated
+        for num_groups, count in enumerate(histogram):
+            if not count:
+                continue
+            row = col.row(align=True)
+            row.label(text=f"{num_groups} group{'' if num_groups == 1 else 's'}")
+            row.label(text=f"{count} ({count / total:.1%})")
+            op = row.operator(MYSTERYEM_select_all_my_trait_number_vertex_groups.bl_idname, text="", icon='RESTRICT_SELECT_OFF')
+            op.number = num_groups
+            op.type = _equal_to_id
+            op.subset = settings.subset
+            op.ignore_zero = settings.ignore_zero
+            op.engine = _engine_numpy
+
+
+class MYSTERYEM_vertex_group_audit_item(bpy.types.PropertyGroup):
+    # name is the name of the Object
+    vertices: bpy.props.IntProperty(name="Vertices")
+    over_limit: bpy.props.IntProperty(name="Over Limit", description="Number of vertices with more vertex groups than the limit")
+    max_influences: bpy.props.IntProperty(name="Max Groups", description="Most vertex groups of any vertex")
+    max_discarded: bpy.props.FloatProperty(name="Max Discarded", description="Most weight that limiting would discard from any vertex")
+    total_discarded: bpy.props.FloatProperty(name="Total Discarded", description="Total weight that limiting would discard")
+
+
+class MYSTERYEM_vertex_group_audit_results(bpy.types.PropertyGroup):
+    results: bpy.props.CollectionProperty(type=MYSTERYEM_vertex_group_audit_item)
+    active_index: bpy.props.IntProperty()
+    limit: bpy.props.IntProperty(name="Limit", description="Limit the results were audited against")
+
+
+class MYSTERYEM_vertex_group_audit(OperatorMixin, bpy.types.Operator):
+    """Audit the number of vertex groups per vertex of every skinned mesh in the scene"""
+    bl_idname = 'mysteryem.vertex_group_audit'
+    bl_label = "Audit Vertex Groups"
+    bl_options = {'REGISTER'}
+    
+    limit: bpy.props.IntProperty(
+        name="Limit",
+        min=1,
+        max=32,
+        default=4,  # Default intended for VRChat usage where there is a max of 4 deform groups per vertex
+        description="Maximum number of vertex groups per vertex",
+    )
+    
+    subset: bpy.props.EnumProperty(
+        name="Subset",
+        items=_subset_items,
+        default=_subset_deform,  # Default intended for VRChat usage where there is a max of 4 deform groups per vertex
+        description="Define which subset of groups shall be counted",
+    )
+    
+    ignore_zero: bpy.props.BoolProperty(
+        default=True,  # Default intended for VRChat usage where there is a max of 4 deform groups per vertex
+        name="Ignore zero weight groups",
+        description="Don't count a vertex group the vertex is in if its weight in that vertex group is zero",
+    )
+    
+    report_path: bpy.props.StringProperty(
+        name="Report Path",
+        description="Optionally write the results as JSON to this path. {file} is replaced with the name of the .blend file, for"
+                    " when auditing many .blend files with batchRunOperators.py",
+        subtype='FILE_PATH',
+    )
+    
+    @staticmethod
+    def get_skinned_objects(scene):
+        # Objects that share a mesh would give the same results, so only the first object of each mesh is audited
+        objects = {}
+        for obj in scene.objects:
+            if (obj.type == 'MESH' and obj.data not in objects and obj.vertex_groups
+                    and any(mod.type == 'ARMATURE' and mod.object for mod in obj.modifiers)):
+                objects[obj.data] = obj
+        return list(objects.values())
+    
+    @classmethod
+    def poll(cls, context):
+        if context.mode != 'OBJECT':
+            cls.poll_message_set("Must be in Object mode")
+            return False
+        return True
+    
+    def execute(self, context):
+        objects = self.get_skinned_objects(context.scene)
+        limit = self.limit
+        
+        # Reading the vertex groups must be done on the main thread, but each mesh is audited on the thread pool while the
+        # vertex groups of the next mesh are read. NumPy releases the GIL for most of the work, so the threads run in parallel
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+            futures = []
+            for obj in objects:
+                offsets, group_indices, weights = get_vertex_group_arrays(obj.data)
+                counted = get_counted_mask(obj, group_indices, get_subset_indices(obj, self.subset))
+                if self.ignore_zero:
+                    counted &= weights != 0
+                futures.append(executor.submit(audit_vertex_group_arrays, offsets, weights, counted, limit))
+            results = [dict(object=obj.name, **future.result()) for obj, future in zip(objects, futures)]
+        
+        audit = context.scene.mysteryem_vertex_group_audit
+        audit.results.clear()
+        audit.limit = limit
+        for result in results:
+            item = audit.results.add()
+            item.name = result["object"]
+            item.vertices = result["vertices"]
+            item.over_limit = result["over_limit"]
+            item.max_influences = result["max_influences"]
+            item.max_discarded = result["max_discarded"]
+            item.total_discarded = result["total_discarded"]
+        
+        if self.report_path:
+            file_name = os.path.splitext(os.path.basename(bpy.data.filepath))[0] or "untitled"
+            report_path = bpy.path.abspath(self.report_path.replace("{file}", file_name))
+            with open(report_path, "w", encoding='utf-8') as f:
+                json.dump({"file": bpy.data.filepath, "limit": limit, "subset": self.subset, "ignore_zero": self.ignore_zero,
+                           "objects": results}, f, indent=2)
+        
+        over_limit = [result for result in results if result["over_limit"]]
+        self.report({'INFO'}, f"{len(over_limit)} of {len(results)} skinned meshes have vertices with more than {limit} vertex groups,"
+                              f" {sum(result['over_limit'] for result in over_limit)} vertices in total")
+        return {'FINISHED'}
+
+
+class MYSTERYEM_UL_vertex_group_audit(bpy.types.UIList):
+    sort_by: bpy.props.EnumProperty(
+        name="Sort By",
+        items=(
+            ('over_limit', "Over Limit", "Sort by the number of vertices over the limit"),
+            ('max_influences', "Max Groups", "Sort by the most vertex groups of any vertex"),
+            ('max_discarded', "Max Discarded", "Sort by the most weight that would be discarded from any vertex"),
+            ('vertices', "Vertices", "Sort by the number of vertices"),
+            ('name', "Name", "Sort by name"),
+        ),
+        default='over_limit',
+    )
+    
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row()
+        row.alert = item.over_limit > 0
+        row.label(text=item.name, icon='MESH_DATA')
+        row.label(text=f"{item.over_limit}/{item.vertices}")
+        row.label(text=f"{item.max_influences} max")
+        row.label(text=f"{item.max_discarded:.3f}")
+    
+    def draw_filter(self, context, layout):
+        row = layout.row(align=True)
+        row.prop(self, "filter_name", text="")
+        row.prop(self, "use_filter_invert", text="", icon='ARROW_LEFTRIGHT')
+        row = layout.row(align=True)
+        row.prop(self, "sort_by", text="")
+        row.prop(self, "use_filter_sort_reverse", text="", icon='SORT_DESC' if self.use_filter_sort_reverse else 'SORT_ASC')
+    
+    def filter_items(self, context, data, propname):
+        items = getattr(data, propname)
+        helpers = bpy.types.UI_UL_list
+        flt_flags = helpers.filter_items_by_name(self.filter_name, self.bitflag_filter_item, items, "name")
+        if self.sort_by == 'name':
+            flt_neworder = helpers.sort_items_by_name(items, "name")
+        else:
+            # Largest first, use_filter_sort_reverse puts smallest first
+            sort_by = self.sort_by
+            flt_neworder = helpers.sort_items_helper([(i, -getattr(item, sort_by)) for i, item in enumerate(items)], key=lambda x: x[1])
+        return flt_flags, flt_neworder
+
+
+class MYSTERYEM_PT_vertex_group_audit(bpy.types.Panel):
+    bl_idname = 'MYSTERYEM_PT_vertex_group_audit'
+    bl_label = "Vertex Group Audit"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Item"
+    bl_context = 'objectmode'
+    bl_options = {'DEFAULT_CLOSED'}
+    
+    def draw(self, context):
+        layout = self.layout
+        audit = context.scene.mysteryem_vertex_group_audit
+        layout.operator(MYSTERYEM_vertex_group_audit.bl_idname, icon='VIEWZOOM')
+        if audit.results:
+            layout.label(text=f"Over Limit ({audit.limit}) / Vertices, Max Groups, Max Discarded")
+            layout.template_list(MYSTERYEM_UL_vertex_group_audit.__name__, "", audit, "results", audit, "active_index")
+
 
 def draw_menu(self, context):
     layout = self.layout
     layout.separator()
     layout.operator(MYSTERYEM_select_all_my_trait_number_vertex_groups.bl_idname)
 
+def draw_vertex_group_menu(self, context):
+    layout = self.layout
+    layout.separator()
+    layout.operator(MYSTERYEM_vertex_group_limit_total.bl_idname)
+
 def register(add_to_menu=True):
     bpy.utils.register_class(MYSTERYEM_select_all_my_trait_number_vertex_groups)
+    bpy.utils.register_class(MYSTERYEM_vertex_group_limit_total)
+    bpy.utils.register_class(MYSTERYEM_vertex_group_histogram_settings)
+    bpy.utils.register_class(MYSTERYEM_vertex_group_histogram)
+    bpy.utils.register_class(MYSTERYEM_PT_vertex_group_histogram)
+    bpy.types.Scene.mysteryem_vertex_group_histogram = bpy.props.PointerProperty(type=MYSTERYEM_vertex_group_histogram_settings)
+    bpy.utils.register_class(MYSTERYEM_vertex_group_audit_item)
+    bpy.utils.register_class(MYSTERYEM_vertex_group_audit_results)
+    bpy.utils.register_class(MYSTERYEM_vertex_group_audit)
+    bpy.utils.register_class(MYSTERYEM_UL_vertex_group_audit)
+    bpy.utils.register_class(MYSTERYEM_PT_vertex_group_audit)
+    bpy.types.Scene.mysteryem_vertex_group_audit = bpy.props.PointerProperty(type=MYSTERYEM_vertex_group_audit_results)
+    bpy.app.handlers.depsgraph_update_post.append(mark_histograms_outdated)
     if add_to_menu:
         bpy.types.VIEW3D_MT_edit_mesh_select_by_trait.append(draw_menu)
+        bpy.types.MESH_MT_vertex_group_context_menu.append(draw_vertex_group_menu)
 
 def unregister():
+    bpy.types.MESH_MT_vertex_group_context_menu.remove(draw_vertex_group_menu)
     bpy.types.VIEW3D_MT_edit_mesh_select_by_trait.remove(draw_menu)
+    bpy.app.handlers.depsgraph_update_post.remove(mark_histograms_outdated)
+    if bpy.app.timers.is_registered(stop_ignoring_geometry_updates):
+        bpy.app.timers.unregister(stop_ignoring_geometry_updates)
+    _histogram_cache.clear()
+    del bpy.types.Scene.mysteryem_vertex_group_audit
+    bpy.utils.unregister_class(MYSTERYEM_PT_vertex_group_audit)
+    bpy.utils.unregister_class(MYSTERYEM_UL_vertex_group_audit)
+    bpy.utils.unregister_class(MYSTERYEM_vertex_group_audit)
+    bpy.utils.unregister_class(MYSTERYEM_vertex_group_audit_results)
+    bpy.utils.unregister_class(MYSTERYEM_vertex_group_audit_item)
+    del bpy.types.Scene.mysteryem_vertex_group_histogram
+    bpy.utils.unregister_class(MYSTERYEM_PT_vertex_group_histogram)
+    bpy.utils.unregister_class(MYSTERYEM_vertex_group_histogram)
+    bpy.utils.unregister_class(MYSTERYEM_vertex_group_histogram_settings)
+    bpy.utils.unregister_class(MYSTERYEM_vertex_group_limit_total)
     bpy.utils.unregister_class(MYSTERYEM_select_all_my_trait_number_vertex_groups)
 
 if __name__ == '__main__':
@@ -11,10 +11,148 @@ Adds two extra buttons to the Shape Key Specials Menu (shape key context menu) t
 
 This is equivalent to making a copy of the active shape key, mirroring the active shape key, blending the pre-mirror copy into the active shape key
  and then deleting the pre-mirror copy.
+
+The NumPy engine finds which vertex mirrors each vertex itself and does the mirroring and adding in a single pass without using the
+ "Mirror Shape Key" operator. The mirror vertices of recently mirrored meshes are cached by a hash of their vertex positions (and edges when
+ using topology), so mirroring more shape keys of the same mesh doesn't need to find them again. Changing the number of vertices, the positions of
+ the vertices or the edges results in a different hash, so the mirror vertices are then found again.
+
+The single shape key operators default to the "Mirror Shape Key" operator engine, which doesn't use the cache, so the NumPy engine must be picked
+ in the Redo Panel to benefit from it. The batch version below always uses the cache.
+
+Also adds a batch version that additively mirrors every shape key matching a name pattern in a single pass and a single undo step.
  """
 
 import bpy
 import numpy as np
+from fnmatch import fnmatchcase
+from mathutils.kdtree import KDTree
+
+# Uses MeshDataAccess.py when it's installed alongside this addon. Otherwise, minimal versions of the functions are
+# defined here so that this addon also works when installed on its own or run from the Text Editor, just without
+# re-using arrays or the faster attribute access of Blender 3.5+
+try:
+    from MeshDataAccess import get_positions, get_shape_key, set_shape_key, buffer_pool
+except ImportError:
+    from contextlib import contextmanager
+
+    class _BufferPool:
+        """Stand-in for MeshDataAccess.buffer_pool that allocates new arrays instead of re-using them"""
+        def acquire(self, shape, dtype):
+            return np.empty(shape, dtype=dtype)
+
+        def release(self, *arrays):
+            pass
+
+        @contextmanager
+        def borrow(self, shape, dtype):
+            yield np.empty(shape, dtype=dtype)
+
+    buffer_pool = _BufferPool()
+
+    def get_positions(me, out=None):
+        if out is None:
+            out = np.empty((len(me.vertices), 3), dtype=np.single)
+        me.vertices.foreach_get("co", out.ravel())
+        return out
+
+    def get_shape_key(shape_key, out=None):
+        if out is None:
+            out = np.empty((len(shape_key.data), 3), dtype=np.single)
+        shape_key.data.foreach_get("co", out.ravel())
+        return out
+
+    def set_shape_key(shape_key, cos):
+        shape_key.data.foreach_set("co", np.ascontiguousarray(cos, dtype=np.single).ravel())
+
+# Maximum distance between a vertex and the mirrored position of another vertex for them to be considered mirrors of one another, this is the same
+# as the threshold used by Blender
+MIRROR_THRESHOLD = 0.00002
+
+# Mirror vertex indices of recently mirrored meshes, {(use_topology, mesh fingerprint): mirror vertex indices}
+# Dicts keep insertion order, so the least recently used mirror map is always first
+_mirror_map_cache = {}
+_max_cached_mirror_maps = 16
+
+
+def find_spatial_mirror_map(positions):
+    """Find the index of the vertex at the x-mirrored position of each vertex, or -1 where there is no vertex there"""
+    kd = KDTree(len(positions))
+    for i, co in enumerate(positions.tolist()):
+        kd.insert(co, i)
+    kd.balance()
+    mirror_map = np.full(len(positions), -1, dtype=np.intc)
+    for i, (x, y, z) in enumerate(positions.tolist()):
+        _co, index, distance = kd.find((-x, y, z))
+        if index is not None and distance < MIRROR_THRESHOLD:
+            mirror_map[i] = index
+    return mirror_map
+
+
+def find_topology_mirror_map(object):
+    """Find the topology mirror vertex of each vertex, or -1 where there isn't one.
+    Blender doesn't expose topology mirroring other than through the "Mirror Shape Key" operator, so a temporary shape key that stores the index of
+    each vertex is mirrored and then read back"""
+    num_verts = len(object.data.vertices)
+    old_active_index = object.active_shape_key_index
+    probe_key = object.shape_key_add(name="mirror_probe", from_mix=False)
+    try:
+        # x is 1.0 so that the vertices that were mirrored can be identified by x becoming -1.0, y is the index of the vertex
+        probe_positions = np.zeros((num_verts, 3), dtype=np.single)
+        probe_positions[:, 0] = 1
+        probe_positions[:, 1] = np.arange(num_verts)
+        set_shape_key(probe_key, probe_positions)
+        object.active_shape_key_index = len(object.data.shape_keys.key_blocks) - 1
+        bpy.ops.object.shape_key_mirror(use_topology=True)
+        get_shape_key(probe_key, out=probe_positions)
+    finally:
+        object.shape_key_remove(probe_key)
+        object.active_shape_key_index = old_active_index
+    return np.where(probe_positions[:, 0] < 0, np.rint(probe_positions[:, 1]).astype(np.intc), -1)
+
+
+def get_mesh_fingerprint(data, positions, use_topology):
+    if use_topology:
+        edges = np.empty(len(data.edges) * 2, dtype=np.intc)
+        data.edges.foreach_get('vertices', edges)
+        return hash((len(positions), positions.tobytes(), edges.tobytes()))
+    return hash((len(positions), positions.tobytes()))
+
+
+def get_mirror_map(object, use_topology):
+    data = object.data
+    with buffer_pool.borrow((len(data.vertices), 3), np.single) as positions:
+        get_positions(data, out=positions)
+        cache_key = (use_topology, get_mesh_fingerprint(data, positions, use_topology))
+        mirror_map = _mirror_map_cache.pop(cache_key, None)
+        if mirror_map is None:
+            if use_topology:
+                mirror_map = find_topology_mirror_map(object)
+            else:
+                mirror_map = find_spatial_mirror_map(positions)
+            if len(_mirror_map_cache) >= _max_cached_mirror_maps:
+                del _mirror_map_cache[next(iter(_mirror_map_cache))]
+    # (Re-)insert as the most recently used mirror map
+    _mirror_map_cache[cache_key] = mirror_map
+    return mirror_map
+
+
+def clear_mirror_map_cache():
+    _mirror_map_cache.clear()
+
+
+def mirror_positions(positions, mirror_map, out=None):
+    """Mirror positions with shape (..., num_verts, 3) along the local x axis the same way as the "Mirror Shape Key" operator.
+    Vertices without a mirror vertex are left unchanged. The result is written to out when specified, which must not be positions"""
+    has_mirror = mirror_map != -1
+    if out is None:
+        mirrored = positions.copy()
+    else:
+        mirrored = out
+        mirrored[...] = positions
+    mirrored[..., has_mirror, :] = positions[..., mirror_map[has_mirror], :]
+    mirrored[..., has_mirror, 0] *= -1
+    return mirrored
 
 # Mirror a shape key, but add the mirrored shape together with the current shape
 def mirror_shape_key_additive(context, use_topology=False):
@@ -23,58 +161,158 @@ def mirror_shape_key_additive(context, use_topology=False):
     active_key = object.active_shape_key
     relative_key = active_key.relative_key
     # Get the blend shape positions prior to mirroring
-    num_verts = len(active_key.data)
-    num_co = num_verts * 3
-    orig_shape_positions = np.empty(num_co, dtype=np.single)
-    active_key.data.foreach_get('co', orig_shape_positions)
-    # Mirror the original shape key with the op
-    mirror_result = bpy.ops.object.shape_key_mirror(use_topology=use_topology)
-    if 'FINISHED' in mirror_result:
-        # Add the shape key we copied earlier, we figure out how much to move by subtracting the position in the relative key
-        # Get the relative key positions
-        relative_key_positions = np.empty(num_co, dtype=np.single)
-        relative_key.data.foreach_get('co', relative_key_positions)
-        # Get the mirrored key positions
-        mirrored_key_positions = np.empty(num_co, dtype=np.single)
-        active_key.data.foreach_get('co', mirrored_key_positions)
-        # Subtract the relative key to get the movement of the key
-        relative_orig_movement = np.subtract(orig_shape_positions, relative_key_positions, out=orig_shape_positions)
-        # Add the original relative movement to the mirrored positions
-        mirrored_key_positions += relative_orig_movement
-        # Set the updated positions with the mirrored possitions with the original movement added in
-        active_key.data.foreach_set('co', mirrored_key_positions)
-        # The visuals don't update immediately, so we'll set the value of the shape key to cause the visuals to update
-        active_key.value = active_key.value
+    shape = (len(active_key.data), 3)
+    with buffer_pool.borrow(shape, np.single) as orig_shape_positions:
+        get_shape_key(active_key, out=orig_shape_positions)
+        # Mirror the original shape key with the op
+        mirror_result = bpy.ops.object.shape_key_mirror(use_topology=use_topology)
+        if 'FINISHED' in mirror_result:
+            # Add the shape key we copied earlier, we figure out how much to move by subtracting the position in the relative key
+            with buffer_pool.borrow(shape, np.single) as relative_key_positions, \
+                    buffer_pool.borrow(shape, np.single) as mirrored_key_positions:
+                # Get the relative key positions
+                get_shape_key(relative_key, out=relative_key_positions)
+                # Get the mirrored key positions
+                get_shape_key(active_key, out=mirrored_key_positions)
+                # Subtract the relative key to get the movement of the key
+                relative_orig_movement = np.subtract(orig_shape_positions, relative_key_positions, out=orig_shape_positions)
+                # Add the original relative movement to the mirrored positions
+                mirrored_key_positions += relative_orig_movement
+                # Set the updated positions with the mirrored possitions with the original movement added in
+                set_shape_key(active_key, mirrored_key_positions)
+            # The visuals don't update immediately, so we'll set the value of the shape key to cause the visuals to update
+            active_key.value = active_key.value
     # The mirror result already contains 'FINISHED' or an error so just return it as is
     return mirror_result
 
+# Same as mirror_shape_key_additive, but without using the "Mirror Shape Key" operator
+def mirror_shape_key_additive_numpy(context, use_topology=False):
+    object = context.object
+    active_key = object.active_shape_key
+    mirror_map = get_mirror_map(object, use_topology)
+    shape = (len(active_key.data), 3)
+    with buffer_pool.borrow(shape, np.single) as orig_shape_positions, \
+            buffer_pool.borrow(shape, np.single) as relative_key_positions, \
+            buffer_pool.borrow(shape, np.single) as mirrored_key_positions:
+        get_shape_key(active_key, out=orig_shape_positions)
+        get_shape_key(active_key.relative_key, out=relative_key_positions)
+        # Add the original relative movement to the mirrored positions
+        mirror_positions(orig_shape_positions, mirror_map, out=mirrored_key_positions)
+        mirrored_key_positions += orig_shape_positions
+        mirrored_key_positions -= relative_key_positions
+        set_shape_key(active_key, mirrored_key_positions)
+    # The visuals don't update immediately, so we'll set the value of the shape key to cause the visuals to update
+    active_key.value = active_key.value
+    return {'FINISHED'}
+
+# Additively mirror many shape keys at once, returns the number of shape keys mirrored
+def mirror_shape_keys_additive_batch(object, shape_keys, use_topology=False):
+    # Shape keys relative to themselves don't move, so there's nothing to add
+    shape_keys = [key for key in shape_keys if key.relative_key != key]
+    if not shape_keys:
+        return 0
+    mirror_map = get_mirror_map(object, use_topology)
+    num_keys = len(shape_keys)
+    num_verts = len(object.data.vertices)
+    relative_key_names = list(dict.fromkeys(key.relative_key.name for key in shape_keys))
+    relative_indices = [relative_key_names.index(key.relative_key.name) for key in shape_keys]
+    key_blocks = object.data.shape_keys.key_blocks
+    shape = (num_keys, num_verts, 3)
+    with buffer_pool.borrow(shape, np.single) as orig_shape_positions, \
+            buffer_pool.borrow(shape, np.single) as mirrored_key_positions, \
+            buffer_pool.borrow((len(relative_key_names), num_verts, 3), np.single) as relative_key_positions:
+        # Read every shape key into one array
+        for key, positions in zip(shape_keys, orig_shape_positions):
+            get_shape_key(key, out=positions)
+        # Read each relative key only once
+        for name, positions in zip(relative_key_names, relative_key_positions):
+            get_shape_key(key_blocks[name], out=positions)
+
+        mirror_positions(orig_shape_positions, mirror_map, out=mirrored_key_positions)
+        mirrored_key_positions += orig_shape_positions
+        for positions, relative_index in zip(mirrored_key_positions, relative_indices):
+            positions -= relative_key_positions[relative_index]
+        for key, positions in zip(shape_keys, mirrored_key_positions):
+            set_shape_key(key, positions)
+            # The visuals don't update immediately, so we'll set the value of the shape key to cause the visuals to update
+            key.value = key.value
+    return num_keys
+
 class MYSTERYEM_shape_key_mirror_additive(bpy.types.Operator):
     #tooltip
-    """Add the mirror of the current shape key along the local x axis"""
+    """Add the mirror of the current shape key along the local x axis.
+    Only the NumPy engine remembers the mirror vertices between shape keys"""
     
     bl_idname = "mysteryem.shape_key_mirror_additive"
     bl_label = "Mirror shape key (Additive)"
     bl_context = "objectmode"
     bl_options = {'REGISTER', 'UNDO'}
     use_topology: bpy.props.BoolProperty(name="Use Topology", default=False)
+    engine: bpy.props.EnumProperty(
+        name="Engine",
+        items=(
+            ('OPERATOR', "Operator", "Mirror using the Mirror Shape Key operator, which finds the mirror vertices again for every shape"
+                                     " key"),
+            ('NUMPY', "NumPy", "Mirror without using the Mirror Shape Key operator, remembering the mirror vertices for the next shape key."
+                               " Much faster when mirroring many shape keys"),
+        ),
+        default='OPERATOR',
+    )
     
     @classmethod
     def poll(cls, context):
         return context.mode == 'OBJECT' and context.object and context.object.type == 'MESH' and context.object.active_shape_key
     
     def execute(self, context):
+        if self.engine == 'NUMPY':
+            return mirror_shape_key_additive_numpy(context, use_topology=self.use_topology)
         return mirror_shape_key_additive(context, use_topology=self.use_topology)
 
+class MYSTERYEM_shape_key_mirror_additive_batch(bpy.types.Operator):
+    #tooltip
+    """Add the mirror of every shape key matching the name pattern along the local x axis"""
+    
+    bl_idname = "mysteryem.shape_key_mirror_additive_batch"
+    bl_label = "Mirror shape keys (Additive) (Batch)"
+    bl_context = "objectmode"
+    bl_options = {'REGISTER', 'UNDO'}
+    pattern: bpy.props.StringProperty(
+        name="Shape Keys",
+        description="Names of the shape keys to mirror. Supports wildcards, e.g. '*_L'. Separate multiple patterns with commas",
+        default="*",
+    )
+    use_topology: bpy.props.BoolProperty(name="Use Topology", default=False)
+    
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'OBJECT' and context.object and context.object.type == 'MESH' and context.object.active_shape_key
+    
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
+    
+    def execute(self, context):
+        object = context.object
+        patterns = [pattern.strip() for pattern in self.pattern.split(",") if pattern.strip()]
+        key_blocks = object.data.shape_keys.key_blocks
+        shape_keys = [key for key in key_blocks[1:] if any(fnmatchcase(key.name, pattern) for pattern in patterns)]
+        num_mirrored = mirror_shape_keys_additive_batch(object, shape_keys, use_topology=self.use_topology)
+        self.report({'INFO'}, f"Mirrored {num_mirrored} shape key{'s' if num_mirrored != 1 else ''}")
+        return {'FINISHED'}
+
 def draw_menu(self, context):
     self.layout.operator(MYSTERYEM_shape_key_mirror_additive.bl_idname, icon='ARROW_LEFTRIGHT').use_topology = False
     self.layout.operator(MYSTERYEM_shape_key_mirror_additive.bl_idname, text="Mirror shape key (Additive) (Topology)").use_topology = True
+    self.layout.operator(MYSTERYEM_shape_key_mirror_additive_batch.bl_idname)
 
 def register():
     bpy.utils.register_class(MYSTERYEM_shape_key_mirror_additive)
+    bpy.utils.register_class(MYSTERYEM_shape_key_mirror_additive_batch)
     bpy.types.MESH_MT_shape_key_context_menu.append(draw_menu)
 
 def unregister():
+    clear_mirror_map_cache()
     bpy.types.MESH_MT_shape_key_context_menu.remove(draw_menu)
+    bpy.utils.unregister_class(MYSTERYEM_shape_key_mirror_additive_batch)
     bpy.utils.unregister_class(MYSTERYEM_shape_key_mirror_additive)
 
 # Test from text editor
@@ -2,7 +2,7 @@ bl_info = {
     "name": "Transfer Shape Keys (Surface Deform)",
     "description": "Transfer shape key movement by automating a surface deform modifier",
     "author": "Mysteryem",
-    "version": (1, 0, 2),
+    "version": (1, 3, 0),
     "blender": (3, 0, 0),
     "location": "View3D > Object > Link/Transfer Data",
     "tracker_url": "https://github.com/Mysteryem/Miscellaneous/issues",
@@ -11,10 +11,256 @@ bl_info = {
 
 """
 Automates adding a Surface Transform modifier and applying it as a shape key for the effect of every shape key of the target mesh
+
+The Evaluate engine skips applying the modifier once per shape key and instead reads the evaluated positions of every
+shape key into a single array, creating all the new shape keys at the end
+
+The Cached Bind engine doesn't use a modifier at all. Each vertex of the mesh to transfer to is bound to the closest
+point on the closest triangle of the mesh to transfer from, with its offset from that point stored in the frame of the
+triangle (along its first edge, across it and along its normal). Each shape key moves the closest point with the corners
+of the triangle and rotates the offset with the triangle, so vertices off the surface follow the surface rotating.
+The modifier blends the binding of several nearby faces instead, so results are similar but not identical to the other
+engines. Bindings are kept in memory for the rest of the Blender session, so that transferring between the same meshes
+again skips binding entirely
+
+With Only Changed enabled, a fingerprint of each transferred shape key is stored on the Object transferred to. When
+transferring again, shape keys that haven't changed since they were last transferred are skipped and shape keys that
+have changed overwrite the shape keys previously transferred to instead of creating duplicates
 """
 
 import bpy
+import hashlib
 import numpy as np
+from mathutils.bvhtree import BVHTree
+
+# Uses MeshDataAccess.py when it's installed alongside this addon. Otherwise, minimal versions of the functions are
+# defined here so that this addon also works when installed on its own or run from the Text Editor, just without
+# re-using arrays or the faster attribute access of Blender 3.5+
+try:
+    from MeshDataAccess import (get_positions, set_positions, get_shape_key, set_shape_key, get_deform_weights, buffer_pool,
+                                profile_execute, phase)
+except ImportError:
+    from contextlib import contextmanager, nullcontext
+
+    class _BufferPool:
+        """Stand-in for MeshDataAccess.buffer_pool that allocates new arrays instead of re-using them"""
+        def acquire(self, shape, dtype):
+            return np.empty(shape, dtype=dtype)
+
+        def release(self, *arrays):
+            pass
+
+        @contextmanager
+        def borrow(self, shape, dtype):
+            yield np.empty(shape, dtype=dtype)
+
+    buffer_pool = _BufferPool()
+
+    def profile_execute(execute):
+        return execute
+
+    def phase(_name):
+        return nullcontext()
+
+    def get_positions(me, out=None):
+        if out is None:
+            out = np.empty((len(me.vertices), 3), dtype=np.single)
+        me.vertices.foreach_get("co", out.ravel())
+        return out
+
+    def set_positions(me, positions):
+        me.vertices.foreach_set("co", np.ascontiguousarray(positions, dtype=np.single).ravel())
+
+    def get_shape_key(shape_key, out=None):
+        if out is None:
+            out = np.empty((len(shape_key.data), 3), dtype=np.single)
+        shape_key.data.foreach_get("co", out.ravel())
+        return out
+
+    def set_shape_key(shape_key, cos):
+        shape_key.data.foreach_set("co", np.ascontiguousarray(cos, dtype=np.single).ravel())
+
+    def get_vertex_group_arrays(me, vertex_indices=None):
+        vertices = me.vertices if vertex_indices is None else [me.vertices[i] for i in vertex_indices.tolist()]
+        offsets = np.zeros(len(vertices) + 1, dtype=np.intc)
+        np.cumsum(np.fromiter((len(v.groups) for v in vertices), dtype=np.intc, count=len(vertices)), out=offsets[1:])
+        group_indices = np.empty(offsets[-1], dtype=np.intc)
+        weights = np.empty(offsets[-1], dtype=np.single)
+        for v, start, end in zip(vertices, offsets[:-1].tolist(), offsets[1:].tolist()):
+            if start != end:
+                v.groups.foreach_get('group', group_indices[start:end])
+                v.groups.foreach_get('weight', weights[start:end])
+        return offsets, group_indices, weights
+
+    def get_deform_weights(me, group_index, out=None, vertex_group_arrays=None, vertex_indices=None):
+        num_verts = len(me.vertices) if vertex_indices is None else len(vertex_indices)
+        if out is None:
+            out = np.empty(num_verts, dtype=np.single)
+        out.fill(0)
+        offsets, group_indices, weights = vertex_group_arrays or get_vertex_group_arrays(me, vertex_indices)
+        in_group = group_indices == group_index
+        out[np.repeat(np.arange(num_verts), np.diff(offsets))[in_group]] = weights[in_group]
+        return out
+
+# engine constants
+_engine_apply = 'APPLY_AS_SHAPE'
+_engine_evaluate = 'EVALUATE'
+_engine_cached = 'CACHED_BIND'
+
+# Bindings of recent transfers in this Blender session,
+# {(from_fingerprint, to_fingerprint): (triangle_vertex_indices, triangle_weights, local_offsets)}
+# The fingerprints use hash(), which is salted differently in each session, so bindings are never saved.
+# Dicts keep insertion order, so the oldest binding is always first
+_binding_cache = {}
+_max_cached_bindings = 8
+
+# Custom property of transfer_to that stores the fingerprints of transferred shape keys, {shape key name: fingerprint}
+_fingerprints_property = "mysteryem_transfer_shape_key_fingerprints"
+
+
+def set_mesh_positions(me, cos):
+    # !!!Blender doesn't automatically update mesh vertices to match basis shape key, we have to do it ourselves!
+    set_positions(me, cos)
+    me.update()
+
+
+def set_basis(obj, name, cos):
+    me = obj.data
+    if not me.shape_keys:
+        obj.shape_key_add(from_mix=False)
+    reference_key = me.shape_keys.reference_key
+    set_shape_key(reference_key, cos)
+    set_mesh_positions(me, cos)
+    reference_key.name = name
+
+
+def get_existing_shape_key(obj, name):
+    """Get the non-reference shape key of obj with the specified name if it exists"""
+    shape_keys = obj.data.shape_keys
+    if not shape_keys:
+        return None
+    shape_key = shape_keys.key_blocks.get(name)
+    if shape_key == shape_keys.reference_key:
+        return None
+    return shape_key
+
+
+def add_shape_keys(obj, shapes, shape_cos_rows, overwrite=False):
+    if not obj.data.shape_keys:
+        # Applying as a shape key would have created a basis automatically
+        obj.shape_key_add(name="Basis", from_mix=False)
+    for shape, shape_cos in zip(shapes, shape_cos_rows):
+        shape_key = get_existing_shape_key(obj, shape.name) if overwrite else None
+        if shape_key is None:
+            shape_key = obj.shape_key_add(name=shape.name, from_mix=False)
+        set_shape_key(shape_key, shape_cos)
+    obj.data.update()
+
+
+def get_shape_key_fingerprints(shapes, settings):
+    """Fingerprint the movement of each shape key, combined with a string of the settings used to transfer it.
+    Unlike hash(), the fingerprints are the same in every Blender session, so they can be saved in .blend files"""
+    shape = (len(shapes[0].data), 3)
+    fingerprints = {}
+    with buffer_pool.borrow(shape, np.single) as cos, buffer_pool.borrow(shape, np.single) as relative_cos:
+        for shape_key in shapes:
+            get_shape_key(shape_key, out=cos)
+            get_shape_key(shape_key.relative_key, out=relative_cos)
+            fingerprint = hashlib.blake2b(settings.encode(), digest_size=16)
+            fingerprint.update(cos)
+            fingerprint.update(relative_cos)
+            fingerprints[shape_key.name] = fingerprint.hexdigest()
+    return fingerprints
+
+
+def get_fingerprint(cos, *arrays):
+    return hash((len(cos), cos.tobytes(), *(a.tobytes() for a in arrays)))
+
+
+def get_triangle_frames(corners):
+    """Get the orthonormal frame of each triangle from the corners of the triangles with shape (N, 3, 3).
+
+    Returns an array with shape (N, 3, 3) where the rows of each frame are the direction of the first edge, the direction
+    across the triangle and the normal. Degenerate triangles get the identity frame"""
+    tangent = corners[:, 1] - corners[:, 0]
+    normal = np.cross(tangent, corners[:, 2] - corners[:, 0])
+    tangent_length = np.linalg.norm(tangent, axis=1)
+    normal_length = np.linalg.norm(normal, axis=1)
+    degenerate = (tangent_length == 0) | (normal_length == 0)
+    tangent_length[degenerate] = 1
+    normal_length[degenerate] = 1
+    tangent /= tangent_length[:, np.newaxis]
+    normal /= normal_length[:, np.newaxis]
+    tangent[degenerate] = (1, 0, 0)
+    normal[degenerate] = (0, 0, 1)
+    return np.stack((tangent, np.cross(normal, tangent), normal), axis=1)
+
+
+def get_surface_points(corners, triangle_weights):
+    return np.einsum('ij,ijk->ik', triangle_weights, corners)
+
+
+def bind_to_closest_triangles(to_cos, from_cos, triangles):
+    """Bind each vertex to the closest point on the closest triangle.
+
+    Returns the vertex indices of each closest triangle and the barycentric weights of each closest point, both with shape
+    (len(to_cos), 3), and the offset of each vertex from its closest point in the frame of its triangle, see
+    get_triangle_frames"""
+    bvh = BVHTree.FromPolygons(from_cos.tolist(), triangles.tolist(), all_triangles=True)
+    num_verts = len(to_cos)
+    triangle_indices = np.empty(num_verts, dtype=np.intc)
+    closest = np.empty((num_verts, 3), dtype=np.single)
+    for i, co in enumerate(to_cos.tolist()):
+        location, _normal, index, _distance = bvh.find_nearest(co)
+        triangle_indices[i] = index
+        closest[i] = location
+    triangle_vertex_indices = triangles[triangle_indices]
+
+    # Barycentric coordinates of the closest points
+    corners = from_cos[triangle_vertex_indices]
+    a, b, c = corners[:, 0], corners[:, 1], corners[:, 2]
+    v0 = b - a
+    v1 = c - a
+    v2 = closest - a
+    d00 = np.einsum('ij,ij->i', v0, v0)
+    d01 = np.einsum('ij,ij->i', v0, v1)
+    d11 = np.einsum('ij,ij->i', v1, v1)
+    d20 = np.einsum('ij,ij->i', v2, v0)
+    d21 = np.einsum('ij,ij->i', v2, v1)
+    denominator = d00 * d11 - d01 * d01
+    # Degenerate triangles are bound entirely to their first vertex
+    degenerate = denominator == 0
+    denominator[degenerate] = 1
+    weights = np.empty((num_verts, 3), dtype=np.single)
+    weights[:, 1] = (d11 * d20 - d01 * d21) / denominator
+    weights[:, 2] = (d00 * d21 - d01 * d20) / denominator
+    weights[degenerate, 1:] = 0
+    weights[:, 0] = 1 - weights[:, 1] - weights[:, 2]
+
+    # The closest points are recalculated from the weights so that deforming by zero movement gives back to_cos
+    offsets = to_cos - get_surface_points(corners, weights)
+    local_offsets = np.einsum('nij,nj->ni', get_triangle_frames(corners), offsets)
+    return triangle_vertex_indices, weights, local_offsets
+
+
+def deform_bound_vertices(from_cos, binding):
+    """Get the positions of bound vertices when the mesh they are bound to has the positions from_cos"""
+    triangle_vertex_indices, triangle_weights, local_offsets = binding
+    corners = from_cos[triangle_vertex_indices]
+    offsets = np.einsum('nij,ni->nj', get_triangle_frames(corners), local_offsets)
+    return get_surface_points(corners, triangle_weights) + offsets
+
+
+def get_vertex_group_weights(obj, name, invert):
+    vertex_group = obj.vertex_groups.get(name)
+    if vertex_group is None:
+        # Like the modifier, a vertex group that doesn't exist affects all vertices
+        return np.ones(len(obj.data.vertices), dtype=np.single)
+    weights = get_deform_weights(obj.data, vertex_group.index)
+    if invert:
+        np.subtract(1, weights, out=weights)
+    return weights
+
 
 class MYSTERYEM_transfer_shape_key_movement(bpy.types.Operator):
     """Transfer Shape Key movement from Selected to Active using a Surface Deform modifier"""
@@ -33,6 +279,28 @@ class MYSTERYEM_transfer_shape_key_movement(bpy.types.Operator):
     vertex_group: bpy.props.StringProperty(name="Vertex Group", description="Vertex group name for selecting/weighting the affected areas", default="")
     invert_vertex_group: bpy.props.BoolProperty(name="Invert Vertex Group", description="Invert vertex group influence", default=False)
     use_sparse_bind: bpy.props.BoolProperty(name="Sparse Bind", description="Only record binding data for vertices matching the vertex group", default=False)
+
+    engine: bpy.props.EnumProperty(
+        name="Engine",
+        items=(
+            (_engine_apply, "Apply as Shape Key", "Apply the modifier as a new shape key once for each shape key"),
+            (_engine_evaluate, "Evaluate", "Read the evaluated positions of each shape key into one array and create all the"
+                                           " shape keys at the end. Much faster when there are many shape keys"),
+            (_engine_cached, "Cached Bind", "Bind each vertex to the closest triangle without a modifier and keep the binding"
+                                            " in memory for the rest of the session for future transfers between the same"
+                                            " meshes. Only the closest triangle is used, so results are similar but not"
+                                            " identical to the modifier. Falloff and Sparse Bind are not used"),
+        ),
+        default=_engine_apply,
+        description="How the shape keys should be created",
+    )
+
+    only_changed: bpy.props.BoolProperty(
+        name="Only Changed",
+        description="Only transfer shape keys that have changed since they were last transferred, overwriting the shape"
+                    " keys that were previously transferred to",
+        default=False,
+    )
         
     @classmethod
     def poll(cls, context):
@@ -62,12 +330,21 @@ class MYSTERYEM_transfer_shape_key_movement(bpy.types.Operator):
         layout = self.layout
         layout.use_property_split = True
         layout.label(text="Surface Deform Modifier settings")
-        layout.prop(self, "falloff")
+        uses_modifier = self.engine != _engine_cached
+        row = layout.row()
+        row.enabled = uses_modifier
+        row.prop(self, "falloff")
         layout.prop(self, "strength")
         layout.prop_search(self, "vertex_group", context.object, "vertex_groups")
         layout.prop(self, "invert_vertex_group")
-        layout.prop(self, "use_sparse_bind")
+        row = layout.row()
+        row.enabled = uses_modifier
+        row.prop(self, "use_sparse_bind")
+        layout.separator()
+        layout.prop(self, "engine")
+        layout.prop(self, "only_changed")
     
+    @profile_execute
     def execute(self, context):
         transfer_to = context.object
         transfer_from = next(o for o in context.selected_objects if o != transfer_to)
@@ -79,6 +356,37 @@ class MYSTERYEM_transfer_shape_key_movement(bpy.types.Operator):
                 self.report({"ERROR"}, "All shape keys must be possible to set to 0 and 1")
                 return {'CANCELLED'}
         
+        only_changed = self.only_changed
+        settings = "|".join(map(str, (transfer_from.name, self.engine, self.falloff, self.strength, self.vertex_group,
+                                      self.invert_vertex_group, self.use_sparse_bind)))
+        with phase("fetch"):
+            fingerprints = get_shape_key_fingerprints(key_blocks[1:], settings)
+        if only_changed:
+            old_fingerprints = transfer_to.get(_fingerprints_property)
+            old_fingerprints = old_fingerprints.to_dict() if old_fingerprints else {}
+            shapes = [shape for shape in key_blocks[1:]
+                      if get_existing_shape_key(transfer_to, shape.name) is None
+                      or old_fingerprints.get(shape.name) != fingerprints[shape.name]]
+            if not shapes:
+                self.report({"INFO"}, "No shape keys have changed since they were last transferred")
+                return {'FINISHED'}
+        else:
+            old_fingerprints = {}
+            shapes = key_blocks[1:]
+        
+        if self.engine == _engine_cached:
+            result = self.transfer_cached(transfer_to, transfer_from, shapes)
+        else:
+            result = self.transfer_with_modifier(context, transfer_to, transfer_from, shapes)
+        
+        if 'FINISHED' in result:
+            old_fingerprints.update((shape.name, fingerprints[shape.name]) for shape in shapes)
+            transfer_to[_fingerprints_property] = old_fingerprints
+        return result
+    
+    def transfer_with_modifier(self, context, transfer_to, transfer_from, shapes):
+        key_blocks = transfer_from.data.shape_keys.key_blocks
+        
         surface_deform_mod = transfer_to.modifiers.new("transfer_shapes", 'SURFACE_DEFORM')
         
         # To restore once done
@@ -94,7 +402,8 @@ class MYSTERYEM_transfer_shape_key_movement(bpy.types.Operator):
             # Move modifier to top
             bpy.ops.object.modifier_move_to_index(modifier=surface_deform_mod.name, index=0)
             # Bind to whatever the current shape of the target is
-            bpy.ops.object.surfacedeform_bind(modifier=surface_deform_mod.name)
+            with phase("update"):
+                bpy.ops.object.surfacedeform_bind(modifier=surface_deform_mod.name)
                     
             transfer_to_basis = False
             for shape in key_blocks[1:]:
@@ -105,6 +414,10 @@ class MYSTERYEM_transfer_shape_key_movement(bpy.types.Operator):
                     transfer_to_basis = True
                 shape.value = 0
 
+            if self.engine == _engine_evaluate:
+                return self.transfer_evaluated(context, transfer_to, key_blocks, shapes, surface_deform_mod,
+                                               transfer_to_basis)
+
             if transfer_to_basis:
                 to_shape_keys = transfer_to.data.shape_keys
                 if to_shape_keys and len(to_shape_keys.key_blocks) > 1:
@@ -112,32 +425,32 @@ class MYSTERYEM_transfer_shape_key_movement(bpy.types.Operator):
                                            " to must not have shape keys")
                     return {'CANCELLED'}
             
-                bpy.ops.object.modifier_apply_as_shapekey(keep_modifier=True, modifier=surface_deform_mod.name)
+                with phase("update"):
+                    bpy.ops.object.modifier_apply_as_shapekey(keep_modifier=True, modifier=surface_deform_mod.name)
                 to_shape_keys = transfer_to.data.shape_keys
                 # Remove automatically created or pre-existing 'Basis'
                 transfer_to.shape_key_remove(to_shape_keys.reference_key)
 
-                # !!!Blender doesn't automatically update mesh vertices to match basis shape key, we have to do it ourselves!
-                if bpy.app.version >= (3, 5):
-                    verts = transfer_to.data.attributes["position"].data
-                    verts_attribute = "vector"
-                else:
-                    verts = transfer_to.data.vertices
-                    verts_attribute = "co"
-                vcos = np.empty(len(transfer_to.data.vertices) * 3, dtype=np.single)
-                to_shape_keys.reference_key.data.foreach_get("co", vcos)
-                verts.foreach_set(verts_attribute, vcos)
-                
-                transfer_to.data.update()
+                set_mesh_positions(transfer_to.data, get_shape_key(to_shape_keys.reference_key))
 
                 # New basis will be our added shape key, re-name it to the same as the 'Basis' of `transfer_from`
                 to_shape_keys.reference_key.name = key_blocks[0].name
             
-            for shape in key_blocks[1:]:
-                shape.value = 1
-                bpy.ops.object.modifier_apply_as_shapekey(keep_modifier=True, modifier=surface_deform_mod.name)
-                transfer_to.data.shape_keys.key_blocks[-1].name = shape.name
-                shape.value = 0
+            with buffer_pool.borrow((len(transfer_to.data.vertices), 3), np.single) as shape_cos:
+                for shape in shapes:
+                    existing_shape_key = get_existing_shape_key(transfer_to, shape.name) if self.only_changed else None
+                    shape.value = 1
+                    with phase("update"):
+                        bpy.ops.object.modifier_apply_as_shapekey(keep_modifier=True, modifier=surface_deform_mod.name)
+                    new_shape_key = transfer_to.data.shape_keys.key_blocks[-1]
+                    if existing_shape_key is None:
+                        new_shape_key.name = shape.name
+                    else:
+                        # Overwrite the previously transferred shape key in-place
+                        with phase("write"):
+                            set_shape_key(existing_shape_key, get_shape_key(new_shape_key, out=shape_cos))
+                            transfer_to.shape_key_remove(new_shape_key)
+                    shape.value = 0
         finally:
             # Now tidy up
             for shape, old_value in zip(key_blocks[1:], old_shape_values):
@@ -146,6 +459,155 @@ class MYSTERYEM_transfer_shape_key_movement(bpy.types.Operator):
             transfer_to.modifiers.remove(surface_deform_mod)
         
         return {'FINISHED'}
+    
+    def transfer_evaluated(self, context, transfer_to, key_blocks, shapes, surface_deform_mod, transfer_to_basis):
+        to_mesh = transfer_to.data
+        num_verts = len(to_mesh.vertices)
+        
+        if transfer_to_basis:
+            to_shape_keys = to_mesh.shape_keys
+            if to_shape_keys and len(to_shape_keys.key_blocks) > 1:
+                self.report({"ERROR"}, "Either all shape keys to transfer must have their values set to zero or the mesh to transfer"
+                                       " to must not have shape keys")
+                return {'CANCELLED'}
+        
+        # One row of positions for every shape key
+        with buffer_pool.borrow((len(shapes), num_verts, 3), np.single) as deformed_cos:
+            # Applying as a shape key only applies the one modifier to the mesh without its shape keys, so the other modifiers
+            # need to be disabled and only the reference key shown to get the same evaluated result
+            disabled_modifiers = [mod for mod in transfer_to.modifiers if mod != surface_deform_mod and mod.show_viewport]
+            old_show_only_shape_key = transfer_to.show_only_shape_key
+            old_active_shape_key_index = transfer_to.active_shape_key_index
+            try:
+                for mod in disabled_modifiers:
+                    mod.show_viewport = False
+                transfer_to.show_only_shape_key = True
+                transfer_to.active_shape_key_index = 0
+            
+                depsgraph = context.evaluated_depsgraph_get()
+            
+                def get_evaluated_positions(out):
+                    with phase("update"):
+                        depsgraph.update()
+                    with phase("fetch"):
+                        evaluated_mesh = transfer_to.evaluated_get(depsgraph).data
+                        if len(evaluated_mesh.vertices) != num_verts:
+                            raise ValueError("Evaluated mesh has a different number of vertices")
+                        get_positions(evaluated_mesh, out=out)
+            
+                try:
+                    if transfer_to_basis:
+                        # Everything has been set to zero, so the current evaluated positions are the new basis
+                        basis_cos = np.empty((num_verts, 3), dtype=np.single)
+                        get_evaluated_positions(basis_cos)
+                        # Changing the positions of the mesh changes what the modifier deforms, so this must be done before
+                        # evaluating the other shape keys
+                        # New basis will be named the same as the 'Basis' of `transfer_from`
+                        set_basis(transfer_to, key_blocks[0].name, basis_cos)
+                
+                    for shape, shape_cos in zip(shapes, deformed_cos):
+                        shape.value = 1
+                        get_evaluated_positions(shape_cos)
+                        shape.value = 0
+                except ValueError:
+                    self.report({"ERROR"}, "The Surface Deform modifier must not change the number of vertices, try the Apply as"
+                                           " Shape Key engine instead")
+                    return {'CANCELLED'}
+            finally:
+                for mod in disabled_modifiers:
+                    mod.show_viewport = True
+                transfer_to.show_only_shape_key = old_show_only_shape_key
+                transfer_to.active_shape_key_index = old_active_shape_key_index
+        
+            with phase("write"):
+                add_shape_keys(transfer_to, shapes, deformed_cos, overwrite=self.only_changed)
+        return {'FINISHED'}
+    
+    def transfer_cached(self, transfer_to, transfer_from, shapes):
+        from_mesh = transfer_from.data
+        to_mesh = transfer_to.data
+        key_blocks = from_mesh.shape_keys.key_blocks
+        
+        with phase("fetch"):
+            from_mesh.calc_loop_triangles()
+            if not from_mesh.loop_triangles:
+                self.report({"ERROR"}, "The Object to transfer from must have faces")
+                return {'CANCELLED'}
+            triangles = np.empty(len(from_mesh.loop_triangles) * 3, dtype=np.intc)
+            from_mesh.loop_triangles.foreach_get("vertices", triangles)
+            triangles = triangles.reshape(-1, 3)
+        
+        # The Surface Deform modifier binds to the current shape of transfer_from
+        shape_values = np.array([shape.value for shape in key_blocks[1:]], dtype=np.single)
+        transfer_to_basis = shape_values.any()
+        if transfer_to_basis:
+            to_shape_keys = to_mesh.shape_keys
+            if to_shape_keys and len(to_shape_keys.key_blocks) > 1:
+                self.report({"ERROR"}, "Either all shape keys to transfer must have their values set to zero or the mesh to transfer"
+                                       " to must not have shape keys")
+                return {'CANCELLED'}
+        
+        num_from_verts = len(from_mesh.vertices)
+        with buffer_pool.borrow((len(key_blocks), num_from_verts, 3), np.single) as key_cos:
+            with phase("fetch"):
+                # Read every shape key of transfer_from at once
+                for key_block, cos in zip(key_blocks, key_cos):
+                    get_shape_key(key_block, out=cos)
+            # Movement of each shape key relative to its relative key
+            relative_indices = [key_blocks.find(shape.relative_key.name) for shape in key_blocks[1:]]
+            shape_movement = key_cos[1:] - key_cos[relative_indices]
+            bind_movement = np.einsum('k,kij->ij', shape_values, shape_movement)
+            
+            # Work in the local space of transfer_to like the modifier does
+            from_to_local = np.array(transfer_to.matrix_world.inverted_safe() @ transfer_from.matrix_world, dtype=np.single)
+            rotation_scale = from_to_local[:3, :3].T
+            from_bind_cos = (key_cos[0] + bind_movement) @ rotation_scale + from_to_local[:3, 3]
+        shape_movement = shape_movement @ rotation_scale
+        bind_movement = bind_movement @ rotation_scale
+        
+        num_to_verts = len(to_mesh.vertices)
+        with phase("fetch"):
+            to_cos = get_positions(to_mesh)
+            influence = get_vertex_group_weights(transfer_to, self.vertex_group, self.invert_vertex_group)
+        
+        with phase("bind"):
+            binding_key = (get_fingerprint(from_bind_cos, triangles), get_fingerprint(to_cos))
+            binding = _binding_cache.pop(binding_key, None)
+            if binding is None:
+                binding = bind_to_closest_triangles(to_cos, from_bind_cos, triangles)
+                if len(_binding_cache) >= _max_cached_bindings:
+                    del _binding_cache[next(iter(_binding_cache))]
+            # (Re-)insert as the most recently used binding
+            _binding_cache[binding_key] = binding
+        influence *= self.strength
+        influence = influence[:, np.newaxis]
+        # transfer_from with every shape key at zero
+        from_base_cos = from_bind_cos - bind_movement
+        
+        def deform(from_cos):
+            # Like the modifier, the influence blends between the original and deformed positions
+            deformed = deform_bound_vertices(from_cos, binding)
+            deformed -= to_cos
+            deformed *= influence
+            deformed += to_cos
+            return deformed
+        
+        if transfer_to_basis:
+            # All shape keys at zero deforms transfer_to into the new basis
+            with phase("compute"):
+                basis_cos = deform(from_base_cos)
+            with phase("write"):
+                set_basis(transfer_to, key_blocks[0].name, basis_cos.ravel())
+        
+        with buffer_pool.borrow((len(shapes), num_to_verts, 3), np.single) as shape_cos_rows:
+            with phase("compute"):
+                for shape, shape_cos in zip(shapes, shape_cos_rows):
+                    # shape_movement excludes the reference key
+                    movement = shape_movement[key_blocks.find(shape.name) - 1]
+                    shape_cos[:] = deform(from_base_cos + movement)
+            with phase("write"):
+                add_shape_keys(transfer_to, shapes, shape_cos_rows.reshape(len(shapes), -1), overwrite=self.only_changed)
+        return {'FINISHED'}
 
 def draw_menu(self, context):
     layout = self.layout
@@ -0,0 +1,201 @@
+# Run the mysteryem operators of the addons in this folder headlessly over many .blend files, spread across multiple background Blender
+# instances at once.
+#
+# Usage (with any Python 3 install, this starts the Blender instances itself):
+#   python batchRunOperators.py job.json a.blend b.blend ... [--blender /path/to/blender] [--jobs 4] [--timeout 600] [--results results.json]
+#
+# Each .blend file is opened in its own background Blender instance, which runs this script again as a worker:
+#   blender -b a.blend --factory-startup --python batchRunOperators.py -- --worker job.json
+#
+# The job spec is a JSON file such as:
+# {
+#     "addons": ["SelectAllByTraitNumberOfVertexGroups.py", "CopyUVsToOtherUVMap.py"],
+#     "steps": [
+#         {
+#             "operator": "mysteryem.mesh_select_by_number_vertex_groups",
+#             "mode": "EDIT",
+#             "objects": ["Body"],
+#             "properties": {"number": 4, "engine": "NUMPY"}
+#         }
+#     ],
+#     "save": false
+# }
+#
+# "addons" are paths to addon files, relative to the job spec, that get registered before running the steps.
+# Each step selects "objects" (all mesh objects when omitted), makes the first one active, switches to "mode" (defaults to "OBJECT") and then calls
+# "operator" with "properties". Properties that take a set of enum items, such as the "filter" of mysteryem.uv_copy_to_other_uvmap, are given
+# as lists. "save" saves each .blend file after all its steps have run.
+#
+# The results of every file, including the time taken by each step, are printed as a summary and optionally written to a JSON file.
+#
+# For example, to audit the vertex groups of every skinned mesh in many .blend files, writing a report for each file:
+# {
+#     "addons": ["SelectAllByTraitNumberOfVertexGroups.py"],
+#     "steps": [
+#         {
+#             "operator": "mysteryem.vertex_group_audit",
+#             "properties": {"limit": 4, "report_path": "/path/to/reports/{file}.json"}
+#         }
+#     ]
+# }
+
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Prefix of the line a worker prints its results on so that they can be found among Blender's own output
+RESULT_PREFIX = "MYSTERYEM_BATCH_RESULT:"
+
+
+def load_job(job_path):
+    with open(job_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+# Worker functions, these are run inside Blender
+def register_addons(job, job_dir):
+    import importlib.util
+    for addon_path in job.get("addons", []):
+        addon_path = os.path.join(job_dir, addon_path)
+        # Addons import shared modules from their own folder, like Blender does when they're installed in an addons folder
+        addon_dir = os.path.dirname(os.path.abspath(addon_path))
+        if addon_dir not in sys.path:
+            sys.path.insert(0, addon_dir)
+        module_name = os.path.splitext(os.path.basename(addon_path))[0]
+        spec = importlib.util.spec_from_file_location(module_name, addon_path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+        module.register()
+
+
+def prepare_step_context(step):
+    import bpy
+    if bpy.context.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    view_layer = bpy.context.view_layer
+    object_names = step.get("objects")
+    if object_names is None:
+        objects = [obj for obj in view_layer.objects if obj.type == 'MESH']
+    else:
+        objects = [bpy.data.objects[name] for name in object_names]
+    if not objects:
+        raise ValueError("No objects to run the step on")
+    for obj in view_layer.objects:
+        obj.select_set(False)
+    for obj in objects:
+        obj.select_set(True)
+    view_layer.objects.active = objects[0]
+    mode = step.get("mode", 'OBJECT')
+    if mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode=mode)
+
+
+def get_operator_properties(operator, properties):
+    """Convert properties loaded from JSON to the types the operator expects"""
+    rna_properties = operator.get_rna_type().properties
+    converted = {}
+    for name, value in properties.items():
+        rna_property = rna_properties.get(name)
+        # JSON has no sets, but ENUM_FLAG properties only accept sets
+        if isinstance(value, list) and rna_property is not None and getattr(rna_property, "is_enum_flag", False):
+            value = set(value)
+        converted[name] = value
+    return converted
+
+
+def run_step(step):
+    import bpy
+    category, name = step["operator"].split(".")
+    operator = getattr(getattr(bpy.ops, category), name)
+    properties = get_operator_properties(operator, step.get("properties", {}))
+    prepare_step_context(step)
+    start = time.perf_counter()
+    result = operator(**properties)
+    duration = time.perf_counter() - start
+    return {"operator": step["operator"], "result": sorted(result), "seconds": duration}
+
+
+def run_worker(job_path):
+    import bpy
+    job = load_job(job_path)
+    results = {"file": bpy.data.filepath, "steps": [], "error": None}
+    try:
+        register_addons(job, os.path.dirname(os.path.abspath(job_path)))
+        for step in job.get("steps", []):
+            results["steps"].append(run_step(step))
+        if bpy.context.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+        if job.get("save", False):
+            bpy.ops.wm.save_mainfile()
+    except Exception as e:
+        results["error"] = f"{type(e).__name__}: {e}"
+    print(RESULT_PREFIX + json.dumps(results), flush=True)
+
+
+# Runner functions, these start the Blender instances
+def run_file(blender, job_path, blend_path, timeout):
+    args = [blender, "-b", blend_path, "--factory-startup", "--python", os.path.abspath(__file__), "--", "--worker", os.path.abspath(job_path)]
+    start = time.perf_counter()
+    try:
+        process = subprocess.run(args, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"file": blend_path, "steps": [], "error": f"Timed out after {timeout} seconds", "seconds": time.perf_counter() - start}
+    duration = time.perf_counter() - start
+    for line in process.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            result = json.loads(line[len(RESULT_PREFIX):])
+            break
+    else:
+        # Blender crashed or couldn't open the file
+        result = {"file": blend_path, "steps": [], "error": f"No result, Blender exited with code {process.returncode}: {process.stderr[-500:]}"}
+    result["file"] = blend_path
+    result["seconds"] = duration
+    return result
+
+
+def parse_runner_args(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Run mysteryem operators over many .blend files")
+    parser.add_argument("job", help="Path to the job spec JSON file")
+    parser.add_argument("files", nargs="+", help=".blend files to run the job on")
+    parser.add_argument("--blender", default="blender", help="Path to the Blender executable")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Number of Blender instances to run at once")
+    parser.add_argument("--timeout", type=float, default=None, help="Maximum number of seconds to spend on each file")
+    parser.add_argument("--results", help="Path to write the results to as JSON")
+    return parser.parse_args(argv)
+
+
+def run_batch(argv):
+    args = parse_runner_args(argv)
+    start = time.perf_counter()
+    # Each thread only waits on its own Blender process, so threads are enough to keep the Blender instances running in parallel
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        results = list(executor.map(lambda blend_path: run_file(args.blender, args.job, blend_path, args.timeout), args.files))
+    total_duration = time.perf_counter() - start
+
+    failed = 0
+    for result in results:
+        if result["error"]:
+            failed += 1
+            print(f"FAILED {result['file']} ({result['seconds']:.2f}s): {result['error']}")
+        else:
+            step_summary = ", ".join(f"{step['operator']} {'/'.join(step['result'])} {step['seconds']:.3f}s" for step in result["steps"])
+            print(f"OK     {result['file']} ({result['seconds']:.2f}s): {step_summary}")
+    print(f"{len(results) - failed}/{len(results)} files succeeded in {total_duration:.2f}s")
+
+    if args.results:
+        with open(args.results, "w", encoding='utf-8') as f:
+            json.dump({"seconds": total_duration, "files": results}, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    if "--worker" in sys.argv:
+        # Running inside Blender, only the arguments after '--' are for this script
+        run_worker(sys.argv[sys.argv.index("--worker") + 1])
+    else:
+        sys.exit(run_batch(sys.argv[1:]))
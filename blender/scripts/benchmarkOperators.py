@@ -0,0 +1,258 @@
+# Benchmark the mysteryem operators of the addons in this folder on procedurally generated meshes of increasing size.
+#
+# Usage, with background Blender:
+#   blender -b --factory-startup --python benchmarkOperators.py -- [--sizes 1000 10000 100000 1000000] [--shape-keys 8] [--uv-layers 2]
+#                                                                   [--vertex-groups 8] [--repeat 3] [--results results.json]
+# or with the bpy module (https://pypi.org/project/bpy/):
+#   python benchmarkOperators.py [same arguments]
+#
+# Each benchmark is run --repeat times on a fresh grid mesh of every size and the fastest run is recorded. For every run, the wall time and how
+# much the run raised the maximum resident set size of the process are recorded along with the cost per vertex. tracemalloc slows down every
+# Python allocation, which would penalise the BMesh engines far more than the NumPy engines, so the peak Python/NumPy memory is measured by a
+# separate, untimed run on another fresh mesh.
+# The results are written as JSON so that the results of different versions of the addons can be diffed.
+
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+
+import bmesh
+import bpy
+import numpy as np
+
+ADDONS_DIR = os.path.dirname(os.path.abspath(__file__))
+ADDON_FILES = [
+    "SelectAllByTraitNumberOfVertexGroups.py",
+    "CopyUVsToOtherUVMap.py",
+    "ExtraShapeKeyOperations.py",
+    "ShapeKeyMirrorAdditive.py",
+]
+
+
+def register_addons():
+    import importlib.util
+    # The addons import shared modules from the same folder, like Blender does when they're installed in an addons folder
+    if ADDONS_DIR not in sys.path:
+        sys.path.insert(0, ADDONS_DIR)
+    for file_name in ADDON_FILES:
+        module_name = os.path.splitext(file_name)[0]
+        if module_name in sys.modules:
+            continue
+        spec = importlib.util.spec_from_file_location(module_name, os.path.join(ADDONS_DIR, file_name))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+        module.register()
+
+
+def get_max_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024
+
+
+# Mesh generation
+def create_grid_mesh(num_verts, num_shape_keys, num_uv_layers, num_vertex_groups, seed=0):
+    """Create a square grid Object with at least num_verts vertices, centred on the x axis so that it can be mirrored"""
+    rng = np.random.default_rng(seed)
+    side = max(2, math.ceil(math.sqrt(num_verts)))
+    num_verts = side * side
+    me = bpy.data.meshes.new("benchmark")
+
+    x, y = np.meshgrid(np.linspace(-1, 1, side, dtype=np.single), np.linspace(-1, 1, side, dtype=np.single))
+    cos = np.column_stack((x.ravel(), y.ravel(), np.zeros(num_verts, dtype=np.single)))
+    me.vertices.add(num_verts)
+    me.vertices.foreach_set("co", cos.ravel())
+
+    # One quad for each grid cell
+    row_starts = np.arange(side - 1) * side
+    corners = (row_starts[:, np.newaxis] + np.arange(side - 1)).ravel()
+    quads = np.column_stack((corners, corners + 1, corners + side + 1, corners + side)).astype(np.intc)
+    num_quads = len(quads)
+    me.loops.add(num_quads * 4)
+    me.loops.foreach_set("vertex_index", quads.ravel())
+    me.polygons.add(num_quads)
+    me.polygons.foreach_set("loop_start", np.arange(0, num_quads * 4, 4, dtype=np.intc))
+    if not bpy.types.MeshPolygon.bl_rna.properties["loop_total"].is_readonly:
+        # Newer versions of Blender calculate loop_total from the loop_start of the next polygon
+        me.polygons.foreach_set("loop_total", np.full(num_quads, 4, dtype=np.intc))
+    me.update(calc_edges=True)
+    me.validate()
+
+    for i in range(num_uv_layers):
+        uv_layer = me.uv_layers.new(name=f"UVMap{i}")
+        uv_layer.data.foreach_set("uv", rng.random(len(me.loops) * 2, dtype=np.single))
+
+    obj = bpy.data.objects.new("benchmark", me)
+    bpy.context.scene.collection.objects.link(obj)
+
+    if num_shape_keys:
+        obj.shape_key_add(name="Basis", from_mix=False)
+        # Only move the vertices on one side so that there is something to mirror
+        one_side = cos[:, 0] < 0
+        for i in range(num_shape_keys):
+            shape_cos = cos.copy()
+            shape_cos[one_side] += rng.normal(scale=0.01, size=(np.count_nonzero(one_side), 3)).astype(np.single)
+            obj.shape_key_add(name=f"Key{i}", from_mix=False).data.foreach_set("co", shape_cos.ravel())
+        obj.active_shape_key_index = 1
+
+    # Give each vertex a random number of weighted groups, up to 8
+    all_indices = np.arange(num_verts)
+    for i in range(num_vertex_groups):
+        vertex_group = obj.vertex_groups.new(name=f"Group{i}")
+        in_group = all_indices[rng.random(num_verts) < min(1.0, 8 / num_vertex_groups) * 0.75]
+        # vertex_group.add sets the same weight for every index, so use a few different weights
+        for weight, indices in zip((0.0, 0.25, 0.5, 1.0), np.array_split(in_group, 4)):
+            vertex_group.add(indices.tolist(), weight, 'REPLACE')
+    return obj
+
+
+def clear_scene():
+    if bpy.context.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj)
+    for me in list(bpy.data.meshes):
+        bpy.data.meshes.remove(me)
+
+
+def prepare(obj, mode, seed=0):
+    """Select and activate obj and switch to mode.
+    'EDIT_SPARSE' is Edit mode with 1% of the vertices selected and moved, so that they have pending shape key changes"""
+    view_layer = bpy.context.view_layer
+    for other in view_layer.objects:
+        other.select_set(False)
+    obj.select_set(True)
+    view_layer.objects.active = obj
+    if mode == 'EDIT':
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.context.tool_settings.mesh_select_mode = (True, False, False)
+        bpy.ops.mesh.select_all(action='SELECT')
+    elif mode == 'EDIT_SPARSE':
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.context.tool_settings.mesh_select_mode = (True, False, False)
+        bpy.ops.mesh.select_all(action='DESELECT')
+        me = obj.data
+        bm = bmesh.from_edit_mesh(me)
+        bm.verts.ensure_lookup_table()
+        rng = np.random.default_rng(seed)
+        for i in np.flatnonzero(rng.random(len(bm.verts)) < 0.01).tolist():
+            bv = bm.verts[i]
+            bv.select = True
+            bv.co.z += 0.01
+        bm.select_flush_mode()
+        bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
+
+
+# Benchmarks as (name, mode, operator, properties)
+BENCHMARKS = [
+    *(("select_by_number_vertex_groups", 'EDIT', "mysteryem.mesh_select_by_number_vertex_groups",
+       {"number": 4, "subset": 'ALL', "engine": engine}) for engine in ('BMESH', 'NUMPY')),
+    *(("copy_uvs_to_other_uvmap", 'EDIT', "mysteryem.uv_copy_to_other_uvmap",
+       {"target": "UVMap1", "filter": set(), "engine": engine}) for engine in ('BMESH', 'NUMPY')),
+    *(("average_shape_key_movement", 'EDIT', "mesh.mysteryem_average_shape_key_movement",
+       {"mix": 0.5, "engine": engine}) for engine in ('BMESH', 'NUMPY')),
+    ("clear_pending_shape_key_changes", 'EDIT', "mesh.mysteryem_clear_pending_shape_key_changes", {}),
+    # Pending changes are usually made to a few vertices of a dense mesh
+    ("clear_pending_shape_key_changes_sparse", 'EDIT_SPARSE', "mesh.mysteryem_clear_pending_shape_key_changes", {}),
+    ("transfer_pending_shape_key_changes_sparse", 'EDIT_SPARSE', "mesh.mysteryem_transfer_pending_shape_key_changes",
+     {"shape_key_name": "Key1", "mode": 'ADD', "swap_after_execute": False}),
+    *(("shape_key_mirror_additive", 'OBJECT', "mysteryem.shape_key_mirror_additive",
+       {"use_topology": False, "engine": engine}) for engine in ('OPERATOR', 'NUMPY')),
+    ("shape_key_mirror_additive_batch", 'OBJECT', "mysteryem.shape_key_mirror_additive_batch", {"pattern": "*"}),
+]
+
+
+def setup_benchmark(mode, mesh_args):
+    clear_scene()
+    obj = create_grid_mesh(*mesh_args)
+    # The copy benchmark needs every UV to be visible
+    bpy.context.scene.tool_settings.use_uv_select_sync = True
+    prepare(obj, mode)
+
+
+def run_benchmark(mode, operator_path, properties, mesh_args):
+    category, name = operator_path.split(".")
+    operator = getattr(getattr(bpy.ops, category), name)
+
+    setup_benchmark(mode, mesh_args)
+    max_rss_before = get_max_rss_mb()
+    start = time.perf_counter()
+    result = operator(**properties)
+    seconds = time.perf_counter() - start
+    max_rss_after = get_max_rss_mb()
+
+    # Measure memory separately so that tracemalloc doesn't affect the timing
+    setup_benchmark(mode, mesh_args)
+    tracemalloc.start()
+    try:
+        operator(**properties)
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "result": sorted(result),
+        "seconds": seconds,
+        "peak_python_mb": peak / (1024 * 1024),
+        # Only increases when the run needs more memory than any earlier run, so this is a lower bound of the memory the run needed
+        "max_rss_increase_mb": max_rss_after - max_rss_before if max_rss_before is not None else None,
+    }
+
+
+def parse_args(argv):
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark the mysteryem operators")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 1000000], help="Approximate vertex counts to benchmark")
+    parser.add_argument("--shape-keys", type=int, default=8, help="Number of shape keys on each mesh, excluding the basis")
+    parser.add_argument("--uv-layers", type=int, default=2, help="Number of UV Maps on each mesh, at least 2 for the UV copy benchmark")
+    parser.add_argument("--vertex-groups", type=int, default=8, help="Number of vertex groups on each mesh")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of times to run each benchmark, the fastest run is recorded")
+    parser.add_argument("--only", nargs="+", help="Only run benchmarks with these names")
+    parser.add_argument("--results", default="benchmark_results.json", help="Path to write the results to as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv):
+    args = parse_args(argv)
+    register_addons()
+    results = []
+    for size in args.sizes:
+        side = max(2, math.ceil(math.sqrt(size)))
+        num_verts = side * side
+        mesh_args = (num_verts, args.shape_keys, args.uv_layers, args.vertex_groups)
+        for name, mode, operator_path, properties in BENCHMARKS:
+            if args.only and name not in args.only:
+                continue
+            runs = [run_benchmark(mode, operator_path, properties, mesh_args) for _ in range(max(1, args.repeat))]
+            best = min(runs, key=lambda run: run["seconds"])
+            entry = {
+                "benchmark": name,
+                "engine": properties.get("engine"),
+                "vertices": num_verts,
+                "shape_keys": args.shape_keys,
+                "uv_layers": args.uv_layers,
+                "vertex_groups": args.vertex_groups,
+                **best,
+                "ns_per_vertex": best["seconds"] / num_verts * 1e9,
+            }
+            results.append(entry)
+            print(f"{name:<36} {str(entry['engine']):<9} {num_verts:>9} verts {best['seconds']:>9.4f}s {entry['ns_per_vertex']:>10.1f}ns/vert"
+                  f" {best['peak_python_mb']:>9.1f}MB peak")
+    clear_scene()
+
+    with open(args.results, "w", encoding='utf-8') as f:
+        json.dump({"blender_version": bpy.app.version_string, "results": results}, f, indent=2)
+    print(f"Results written to {args.results}")
+
+
+if __name__ == "__main__":
+    # When run by Blender, only the arguments after '--' are for this script
+    main(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:])
@@ -1,51 +1,282 @@
+bl_info = {
+    "name": "Move UV Map",
+    "author": "Mysteryem",
+    "version": (1, 1, 0),
+    "blender": (2, 93, 7),  # Older versions have not been tested
+    "location": "Properties > Object Data > UV Maps",
+    "tracker_url": "https://github.com/Mysteryem/Miscellaneous/issues",
+    "category": "UV",
+}
+
 # Astonishingly, Blender has no way to reorder UV layers, something which is very important for working with exported models outside of Blender.
 # The suggested workaround of duplicating and deleting layers until they're in the order you want is painful
-# This script allows for reordering UV layers by swapping the data and names of two layers since I couldn't figure out a way to reorder them normally
-# Since I don't know the extent of what's possible with Blender addons and scripts, it might be a good idea to add some sanity checks to ensure that
-# len(layer1.data) == len(layer2.data) and that both layers have the same properties for each datum (uv, pin_uv, select and the read-only rna_type),
-# possibly going further, to find all the non-read-only properties and swap them all, instead of doing a hardcoded swap of only the known properties.
+# This script allows for reordering UV layers by moving the data and names of the layers since I couldn't figure out a way to reorder them normally
+#
+# Moving a layer by more than one index is done as a single permutation: every layer that changes index is read once and written once, no matter how
+# far the layer is moved.
 #
+# The Reorder UV Maps operator sets the order of all the UV Maps at once, on every selected mesh.
+
+import bpy
+import numpy as np
+
+# Uses MeshDataAccess.py when it's installed alongside this addon. Otherwise, minimal versions of the functions are
+# defined here so that this addon also works when installed on its own or run from the Text Editor, just without
+# re-using arrays or the faster attribute access of Blender 3.5+
+try:
+    from MeshDataAccess import get_uv_layer, set_uv_layer, buffer_pool, object_mode_round_trip
+except ImportError:
+    from contextlib import contextmanager
+
+    class _BufferPool:
+        """Stand-in for MeshDataAccess.buffer_pool that allocates new arrays instead of re-using them"""
+        def acquire(self, shape, dtype):
+            return np.empty(shape, dtype=dtype)
+
+        def release(self, *arrays):
+            pass
+
+        @contextmanager
+        def borrow(self, shape, dtype):
+            yield np.empty(shape, dtype=dtype)
+
+    buffer_pool = _BufferPool()
+
+    @contextmanager
+    def object_mode_round_trip(mode='EDIT'):
+        if mode == 'OBJECT':
+            yield
+            return
+        bpy.ops.object.mode_set(mode='OBJECT')
+        try:
+            yield
+        finally:
+            bpy.ops.object.mode_set(mode=mode)
+
+    def get_uv_layer(uv_layer, out=None):
+        if out is None:
+            out = np.empty((len(uv_layer.data), 2), dtype=np.single)
+        uv_layer.data.foreach_get("uv", out.ravel())
+        return out
+
+    def set_uv_layer(uv_layer, uvs):
+        uv_layer.data.foreach_set("uv", np.ascontiguousarray(uvs, dtype=np.single).ravel())
+
+# The MeshUVLoop properties other than 'uv' that get moved along with the layers, ('select_edge' only exists in newer versions of Blender).
+# 'uv' is moved with get_uv_layer/set_uv_layer, which avoid the slower MeshUVLoop compatibility path in newer versions of Blender
+_uv_loop_properties = [(prop, dtype, size) for prop, dtype, size in (
+    ('pin_uv', bool, 1),
+    ('select', bool, 1),
+    ('select_edge', bool, 1),
+) if prop in bpy.types.MeshUVLoop.bl_rna.properties]
+
+
+# Internal function for reordering the layers of a mesh. new_order must be a permutation of range(len(uv_layers)) where the layer currently at index
+# new_order[i] gets moved to index i.
+def reorder_uv_layers(me, new_order):
+    # Must be in object mode: trying to change the data in edit mode only changes the names of the layers, I'm guessing because it's already open for
+    # editing by Blender itself
+    uv_layers = me.uv_layers
+    layers = list(uv_layers)
+    moved = [i for i, old_index in enumerate(new_order) if i != old_index]
+    if not moved:
+        return
+    names = [layer.name for layer in layers]
+    active_index = uv_layers.active_index
+    render_index = next((i for i, layer in enumerate(layers) if layer.active_render), None)
+
+    # Read every layer that moves once
+    num_loops = len(me.loops)
+    layer_arrays = {}
+    for old_index in (new_order[i] for i in moved):
+        layer = layers[old_index]
+        layer_data = layer.data
+        uvs = get_uv_layer(layer, out=buffer_pool.acquire((num_loops, 2), np.single))
+        arrays = [uvs]
+        for prop, dtype, size in _uv_loop_properties:
+            array = buffer_pool.acquire(num_loops * size, dtype)
+            layer_data.foreach_get(prop, array)
+            arrays.append(array)
+        layer_arrays[old_index] = arrays
+
+    # Write every layer that moves once
+    for i in moved:
+        layer = layers[i]
+        layer_data = layer.data
+        uvs, *arrays = layer_arrays[new_order[i]]
+        set_uv_layer(layer, uvs)
+        for (prop, _dtype, _size), array in zip(_uv_loop_properties, arrays):
+            layer_data.foreach_set(prop, array)
+    for arrays in layer_arrays.values():
+        buffer_pool.release(*arrays)
+
+    # Can't have two uvmaps with the same name. Blender would add .001 on the end of a changed name if it already exists, so every moved layer is
+    # given a unique temporary name first. Since Blender 3.5, UV maps are attributes, so their names must also be unique among all the attributes
+    temp_names = set(names)
+    if bpy.app.version >= (3, 5):
+        temp_names.update(attribute.name for attribute in me.attributes)
+    for i in moved:
+        temp_name = f"temp{i}"
+        while temp_name in temp_names:
+            temp_name += "_"
+        temp_names.add(temp_name)
+        layers[i].name = temp_name
+    for i in moved:
+        layers[i].name = names[new_order[i]]
+
+    # The active and active render layers move with the layers
+    uv_layers.active_index = new_order.index(active_index)
+    if render_index is not None:
+        layers[new_order.index(render_index)].active_render = True
+
+
 # Internal function for swapping data
-def swap_uv_layers(uv_layers, index1, index2, old_mode = 'OBJECT'):
-    # Trying to swap the data in edit mode only swaps the names of the layers, I'm guessing because it's already open for editing by Blender itself
-    bpy.ops.object.mode_set(mode = 'OBJECT')
-    layer1 = uv_layers[index1]
-    layer2 = uv_layers[index2]
-    layer1_name = layer1.name
-    layer2_name = layer2.name
-    # Can't have two uvmaps with the same name. Blender will add .001 on the end of the changed name if it already exists, so we change to a temporary name first
-    # It doesn't matter if there is already a layer called 'temp' since layer1 will become 'temp.001' and then we change it immediately afterwards
-    layer1.name = 'temp'
-    layer2.name = layer1_name
-    layer1.name = layer2_name
-    for i in range(len(layer1.data)):
-        # The uvs in layer2 don't change without the copy(), not sure why this would only affect uv, and not pin_uv or select
-        layer1_uv = layer1.data[i].uv.copy()
-        layer1_pin_uv = layer1.data[i].pin_uv
-        layer1_select = layer1.data[i].select
-        layer1.data[i].uv = layer2.data[i].uv
-        layer1.data[i].pin_uv = layer2.data[i].pin_uv
-        layer1.data[i].select = layer2.data[i].select
-        layer2.data[i].uv = layer1_uv
-        layer2.data[i].pin_uv = layer1_pin_uv
-        layer2.data[i].select = layer1_select
+def swap_uv_layers(uv_layers, index1, index2, old_mode='OBJECT'):
+    bpy.ops.object.mode_set(mode='OBJECT')
+    new_order = list(range(len(uv_layers)))
+    new_order[index1], new_order[index2] = index2, index1
+    reorder_uv_layers(uv_layers.id_data, new_order)
     # Swap back to whatever mode we were in before swapping to object mode
-    bpy.ops.object.mode_set(mode = old_mode)
+    bpy.ops.object.mode_set(mode=old_mode)
+
 
 def move_active_uv_layer_up():
-    active_object = bpy.context.object
-    uv_layers = active_object.data.uv_layers
-    index = uv_layers.active_index
-    # If the active layer is not already at the top
-    if index > 0:
-        swap_uv_layers(uv_layers, index-1, index, active_object.mode)
-        uv_layers.active_index = index-1
+    bpy.ops.mysteryem.uv_layer_move(type='UP')
+
 
 def move_active_uv_layer_down():
-    active_object = bpy.context.object
-    uv_layers = active_object.data.uv_layers
-    index = uv_layers.active_index
-    # If the active layer is not already at the bottom
-    if index < len(uv_layers) - 1:
-        swap_uv_layers(uv_layers, index, index+1, active_object.mode)
-        uv_layers.active_index = index+1
+    bpy.ops.mysteryem.uv_layer_move(type='DOWN')
+
+
+class MYSTERYEM_move_uv_layer(bpy.types.Operator):
+    """Move the active UV Map"""
+    bl_idname = 'mysteryem.uv_layer_move'
+    bl_label = "Move UV Map"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    type: bpy.props.EnumProperty(
+        name="Type",
+        items=(
+            ('UP', "Up", "Move the active UV Map up by one"),
+            ('DOWN', "Down", "Move the active UV Map down by one"),
+            ('TOP', "Top", "Move the active UV Map to the top"),
+            ('BOTTOM', "Bottom", "Move the active UV Map to the bottom"),
+            ('INDEX', "Index", "Move the active UV Map to the specified index"),
+        ),
+        default='UP',
+    )
+
+    index: bpy.props.IntProperty(
+        name="Index",
+        description="Index to move the active UV Map to when Type is Index",
+        min=0,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.object
+        return bool(obj and obj.type == 'MESH' and len(obj.data.uv_layers) > 1)
+
+    def execute(self, context):
+        obj = context.object
+        uv_layers = obj.data.uv_layers
+        current_index = uv_layers.active_index
+        last_index = len(uv_layers) - 1
+        if self.type == 'UP':
+            index = current_index - 1
+        elif self.type == 'DOWN':
+            index = current_index + 1
+        elif self.type == 'TOP':
+            index = 0
+        elif self.type == 'BOTTOM':
+            index = last_index
+        else:
+            index = self.index
+        index = max(0, min(index, last_index))
+        if index == current_index:
+            return {'FINISHED'}
+
+        new_order = list(range(len(uv_layers)))
+        new_order.insert(index, new_order.pop(current_index))
+
+        with object_mode_round_trip(obj.mode):
+            reorder_uv_layers(obj.data, new_order)
+        return {'FINISHED'}
+
+
+class MYSTERYEM_reorder_uv_layers(bpy.types.Operator):
+    """Reorder all the UV Maps of the selected meshes"""
+    bl_idname = 'mysteryem.uv_layers_reorder'
+    bl_label = "Reorder UV Maps"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    order: bpy.props.StringProperty(
+        name="Order",
+        description="Comma separated names of the UV Maps in the order they should be in. UV Maps that aren't listed are kept in their current"
+                    " order after the listed UV Maps",
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return any(obj.type == 'MESH' for obj in context.selected_objects) or bool(context.object and context.object.type == 'MESH')
+
+    def invoke(self, context, event):
+        if not self.order and context.object and context.object.type == 'MESH':
+            # Start from the current order of the active mesh
+            self.order = ", ".join(layer.name for layer in context.object.data.uv_layers)
+        return context.window_manager.invoke_props_dialog(self)
+
+    def execute(self, context):
+        names = [name.strip() for name in self.order.split(",")]
+        names = [name for name in names if name]
+
+        meshes = {obj.data for obj in context.selected_objects if obj.type == 'MESH'}
+        if context.object and context.object.type == 'MESH':
+            meshes.add(context.object.data)
+
+        new_orders = []
+        for me in meshes:
+            layer_names = [layer.name for layer in me.uv_layers]
+            listed = [layer_names.index(name) for name in dict.fromkeys(names) if name in layer_names]
+            listed_set = set(listed)
+            new_order = listed + [i for i in range(len(layer_names)) if i not in listed_set]
+            if new_order != list(range(len(layer_names))):
+                new_orders.append((me, new_order))
+
+        if not new_orders:
+            self.report({'INFO'}, "UV Maps are already in order")
+            return {'FINISHED'}
+
+        with object_mode_round_trip(context.object.mode if context.object else 'OBJECT'):
+            for me, new_order in new_orders:
+                reorder_uv_layers(me, new_order)
+        self.report({'INFO'}, f"Reordered the UV Maps of {len(new_orders)} mesh{'es' if len(new_orders) != 1 else ''}")
+        return {'FINISHED'}
+
+
+def draw_panel(self, context):
+    if context.mesh and len(context.mesh.uv_layers) > 1:
+        row = self.layout.row(align=True)
+        row.operator(MYSTERYEM_move_uv_layer.bl_idname, text="", icon='TRIA_UP_BAR').type = 'TOP'
+        row.operator(MYSTERYEM_move_uv_layer.bl_idname, text="", icon='TRIA_UP').type = 'UP'
+        row.operator(MYSTERYEM_move_uv_layer.bl_idname, text="", icon='TRIA_DOWN').type = 'DOWN'
+        row.operator(MYSTERYEM_move_uv_layer.bl_idname, text="", icon='TRIA_DOWN_BAR').type = 'BOTTOM'
+        row.separator()
+        row.operator(MYSTERYEM_reorder_uv_layers.bl_idname, text="Reorder", icon='SORTSIZE')
+
+
+def register():
+    bpy.utils.register_class(MYSTERYEM_move_uv_layer)
+    bpy.utils.register_class(MYSTERYEM_reorder_uv_layers)
+    bpy.types.DATA_PT_uv_texture.append(draw_panel)
+
+
+def unregister():
+    bpy.types.DATA_PT_uv_texture.remove(draw_panel)
+    bpy.utils.unregister_class(MYSTERYEM_reorder_uv_layers)
+    bpy.utils.unregister_class(MYSTERYEM_move_uv_layer)
+
+
+# Test from the text editor
+if __name__ == '__main__':
+    register()
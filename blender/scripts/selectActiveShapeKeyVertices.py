@@ -1,3 +1,71 @@
+bl_info = {
+    "name": "Select Shape Key Vertices",
+    "author": "Mysteryem",
+    "version": (1, 1, 0),
+    "blender": (2, 93, 7),  # Older versions have not been tested
+    "location": "Editmode > Select > Select Shape Key Vertices",
+    "tracker_url": "https://github.com/Mysteryem/Miscellaneous/issues",
+    "category": "Mesh",
+}
+
+import bpy
+import bmesh
+import numpy as np
+from bpy.app.handlers import persistent
+from fnmatch import fnmatchcase
+
+# Uses MeshDataAccess.py when it's installed alongside this addon. Otherwise, minimal versions of the functions are
+# defined here so that this addon also works when installed on its own or run from the Text Editor, just without
+# re-using arrays or the faster attribute access of Blender 3.5+
+try:
+    from MeshDataAccess import get_shape_key, get_selection, get_hidden, buffer_pool, object_mode_round_trip
+except ImportError:
+    from contextlib import contextmanager
+
+    class _BufferPool:
+        """Stand-in for MeshDataAccess.buffer_pool that allocates new arrays instead of re-using them"""
+        def acquire(self, shape, dtype):
+            return np.empty(shape, dtype=dtype)
+
+        def release(self, *arrays):
+            pass
+
+        @contextmanager
+        def borrow(self, shape, dtype):
+            yield np.empty(shape, dtype=dtype)
+
+    buffer_pool = _BufferPool()
+
+    @contextmanager
+    def object_mode_round_trip(mode='EDIT'):
+        if mode == 'OBJECT':
+            yield
+            return
+        bpy.ops.object.mode_set(mode='OBJECT')
+        try:
+            yield
+        finally:
+            bpy.ops.object.mode_set(mode=mode)
+
+    def get_shape_key(shape_key, out=None):
+        if out is None:
+            out = np.empty((len(shape_key.data), 3), dtype=np.single)
+        shape_key.data.foreach_get("co", out.ravel())
+        return out
+
+    def _get_flags(me, domain, prop, out):
+        collection = getattr(me, {'VERTEX': 'vertices', 'EDGE': 'edges', 'FACE': 'polygons'}[domain])
+        if out is None:
+            out = np.empty(len(collection), dtype=bool)
+        collection.foreach_get(prop, out)
+        return out
+
+    def get_selection(me, domain='VERTEX', out=None):
+        return _get_flags(me, domain, "select", out)
+
+    def get_hidden(me, domain='VERTEX', out=None):
+        return _get_flags(me, domain, "hide", out)
+
 # The functions here let you select all vertices of the active (currently selected) shape key that move a vertex by more than the specified distance argument
 # With the default argument of 0, this selects all vertices that the active shape key moves
 #
@@ -5,6 +73,15 @@
 # so have presented two options
 #
 #
+# The Select Shape Key Vertices operator is a faster version of the first option which reads the shape keys of all the vertices at once. Its
+# displacement magnitudes are cached, so adjusting the Minimum Distance in the Redo Panel re-selects without reading the shape keys again. It
+# reports how many vertices are moved by more than a few distances, to help pick a Minimum Distance.
+#
+# The Select Vertices Moved By Shape Keys operator does the same for every shape key matching a name pattern (e.g. all visemes), selecting the
+# vertices moved by any or all of them. Every shape key is indexed once, storing only the indices and magnitudes of the vertices it moves. The
+# index is re-used by later executions until shape keys are added, removed, renamed or re-parented, or the mesh is edited.
+# Shape keys relative to themselves, such as the Basis, never move any vertices, so patterns matching them are ignored.
+#
 # This version forces vertex selection on and doesn't use bmesh
 def select_shape_key_verts(min_distance = 0):
     obj = bpy.context.object
@@ -31,13 +108,12 @@ def select_shape_key_verts(min_distance = 0):
         # Go back to EDIT mode so it doesn't look like the mode was changed
         bpy.ops.object.mode_set(mode = 'EDIT')
 
-# This version uses bmesh and you will need to import bmesh if using it directly from the console if it's not already imported.
+# This version uses bmesh
 #
 # When in Face selection mode only, this behaves slightly weird in that it'll show edges in the selection, but at the same time, won't show lone vertices in the selection
 # (despite the fact that they're still selected). Not showing the vertices as selected is the same behaviour as selecting by vertex group, but the edges showing as selected is
 # different behaviour
 #
-#import bmesh
 def select_shape_key_verts_alt(min_distance = 0):
     obj = bpy.context.object
     active_shape_key = obj.active_shape_key
@@ -59,3 +135,293 @@ def select_shape_key_verts_alt(min_distance = 0):
                 v.select = True
         # Flush the selection changes
         bm.select_flush_mode()
+
+
+# Displacement magnitudes of the active shape key of each mesh from the last execution, {mesh pointer: (key name, magnitudes)}
+_displacement_cache = {}
+# Sparse displacements of every shape key of each mesh,
+# {mesh pointer: [signature, outdated, {key name: (moved vertex indices, magnitudes of moved vertices)}]}
+# Entries are marked as outdated when their mesh is edited, rather than removed, so that the Redo Panel can still re-use them, because the
+# shape keys are always the same when redoing.
+_displacement_index_cache = {}
+# Distances summarised in the report of the active shape key operator, to help pick a Minimum Distance
+_summary_thresholds = (0.0, 0.0001, 0.001, 0.01, 0.1)
+# Set by the operators so that the geometry updates caused by their own mode changes don't mark their indices as outdated
+_ignore_geometry_updates = False
+
+
+def get_displacement_magnitudes(shape_key):
+    # Must be in object mode for the shape key data to be up-to-date
+    # The magnitudes get cached, so only the arrays of coordinates are borrowed from the pool
+    shape = (len(shape_key.data), 3)
+    with buffer_pool.borrow(shape, np.single) as displacement, buffer_pool.borrow(shape, np.single) as relative_cos:
+        get_shape_key(shape_key, out=displacement)
+        displacement -= get_shape_key(shape_key.relative_key, out=relative_cos)
+        magnitudes = np.einsum('ij,ij->i', displacement, displacement)
+    return np.sqrt(magnitudes, out=magnitudes)
+
+
+class MYSTERYEM_select_shape_key_vertices(bpy.types.Operator):
+    """Select the vertices moved by the active shape key"""
+    bl_idname = 'mysteryem.select_shape_key_vertices'
+    bl_label = "Select Shape Key Vertices"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    min_distance: bpy.props.FloatProperty(
+        name="Minimum Distance",
+        description="Only select vertices that are moved by more than this distance",
+        default=0.0,
+        min=0.0,
+        subtype='DISTANCE',
+    )
+
+    extend: bpy.props.BoolProperty(
+        name="Extend",
+        description="Extend the selection",
+        default=True,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'EDIT_MESH' and any(obj.active_shape_key for obj in context.objects_in_mode_unique_data)
+
+    def execute(self, context):
+        min_distance = self.min_distance
+        # When adjusting properties in the Redo Panel, the mesh is always the same, so the magnitudes can be re-used
+        use_cache = self.options.is_repeat
+        objects = [obj for obj in context.objects_in_mode_unique_data if obj.active_shape_key]
+        # Number of visible vertices moved by more than each threshold, across all the meshes
+        moved_counts = np.zeros(len(_summary_thresholds), dtype=np.int64)
+        thresholds = np.array(_summary_thresholds, dtype=np.single)
+
+        # Add vertex selection mode to the currently active selection modes
+        bpy.ops.mesh.select_mode(use_extend=True, type='VERT', action='ENABLE')
+        # Set to object mode so that data can be accessed in bulk, going back to EDIT mode afterwards so it doesn't look like the mode was changed
+        with object_mode_round_trip():
+            for obj in objects:
+                me = obj.data
+                active_shape_key = obj.active_shape_key
+                cached = _displacement_cache.get(me.as_pointer()) if use_cache else None
+                if cached and cached[0] == active_shape_key.name and len(cached[1]) == len(me.vertices):
+                    magnitudes = cached[1]
+                else:
+                    magnitudes = get_displacement_magnitudes(active_shape_key)
+                    _displacement_cache[me.as_pointer()] = (active_shape_key.name, magnitudes)
+
+                vertices = me.vertices
+                hide = get_hidden(me)
+                visible_magnitudes = np.sort(magnitudes[~hide])
+                moved_counts += len(visible_magnitudes) - np.searchsorted(visible_magnitudes, thresholds, side='right')
+                select = magnitudes > min_distance
+                select &= ~hide
+                if self.extend:
+                    select |= get_selection(me)
+                vertices.foreach_set('select', select)
+
+        # Update edge/face selection to match the vertex selection
+        for obj in objects:
+            me = obj.data
+            bm = bmesh.from_edit_mesh(me)
+            bm.select_flush_mode()
+            bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
+        # Only the selection and mode were changed, so any displacement index is still valid
+        ignore_geometry_updates()
+
+        summary = ", ".join(f"{threshold:g}: {count}" for threshold, count in zip(_summary_thresholds, moved_counts.tolist()))
+        self.report({'INFO'}, f"Vertices moved by more than each distance: {summary}")
+        return {'FINISHED'}
+
+
+def build_displacement_index(key_blocks, num_verts):
+    """Get the indices and displacement magnitudes of the vertices moved by each shape key, {key name: (indices, magnitudes)}.
+    Shape keys relative to themselves, such as the reference key, never move any vertices so are not included"""
+    index = {}
+    # Only the sparse results are kept, so the same two arrays are re-used to read every shape key
+    with buffer_pool.borrow((num_verts, 3), np.single) as displacement, buffer_pool.borrow((num_verts, 3), np.single) as relative_cos, \
+            buffer_pool.borrow(num_verts, np.single) as magnitudes:
+        for key_block in key_blocks:
+            relative_key = key_block.relative_key
+            if relative_key == key_block:
+                continue
+            get_shape_key(key_block, out=displacement)
+            displacement -= get_shape_key(relative_key, out=relative_cos)
+            np.einsum('ij,ij->i', displacement, displacement, out=magnitudes)
+            np.sqrt(magnitudes, out=magnitudes)
+            moved = np.flatnonzero(magnitudes)
+            index[key_block.name] = (moved, magnitudes[moved])
+    return index
+
+
+def get_displacement_index_signature(me):
+    """Cheap signature of the shape keys of a mesh, which changes when shape keys are added, removed, renamed or change relative key"""
+    key_blocks = me.shape_keys.key_blocks
+    return len(me.vertices), tuple((key_block.name, key_block.relative_key.name) for key_block in key_blocks)
+
+
+def stop_ignoring_geometry_updates():
+    global _ignore_geometry_updates
+    _ignore_geometry_updates = False
+    # Don't repeat
+    return None
+
+
+def ignore_geometry_updates():
+    """Stop the next geometry updates from marking displacement indices as outdated, for the operators' own mode changes"""
+    global _ignore_geometry_updates
+    _ignore_geometry_updates = True
+    # The handler resets the flag, but there may not be any updates, in which case the flag is reset on the next event loop iteration
+    if not bpy.app.timers.is_registered(stop_ignoring_geometry_updates):
+        bpy.app.timers.register(stop_ignoring_geometry_updates, first_interval=0)
+
+
+@persistent
+def mark_displacement_indices_outdated(scene, depsgraph):
+    global _ignore_geometry_updates
+    if _ignore_geometry_updates:
+        _ignore_geometry_updates = False
+        return
+    if not _displacement_index_cache:
+        return
+    for update in depsgraph.updates:
+        if not update.is_updated_geometry:
+            continue
+        updated_id = update.id.original
+        if isinstance(updated_id, bpy.types.Object):
+            updated_id = updated_id.data
+        if isinstance(updated_id, bpy.types.Mesh):
+            cached = _displacement_index_cache.get(updated_id.as_pointer())
+            if cached:
+                cached[1] = True
+
+
+@persistent
+def clear_displacement_caches(_dummy):
+    # Mesh pointers are not valid in other .blend files
+    _displacement_cache.clear()
+    _displacement_index_cache.clear()
+
+
+class MYSTERYEM_select_multi_shape_key_vertices(bpy.types.Operator):
+    """Select the vertices moved by any or all of the shape keys matching a name pattern"""
+    bl_idname = 'mysteryem.select_multi_shape_key_vertices'
+    bl_label = "Select Vertices Moved By Shape Keys"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    pattern: bpy.props.StringProperty(
+        name="Shape Keys",
+        description="Names of the shape keys to check. Supports wildcards, e.g. 'vrc.v_*'. Separate multiple patterns with commas",
+        default="*",
+    )
+
+    mode: bpy.props.EnumProperty(
+        name="Mode",
+        items=(
+            ('ANY', "Any", "Select vertices moved by any of the shape keys"),
+            ('ALL', "All", "Select vertices moved by all of the shape keys"),
+        ),
+        default='ANY',
+    )
+
+    min_distance: bpy.props.FloatProperty(
+        name="Minimum Distance",
+        description="Only count vertices that are moved by more than this distance",
+        default=0.0,
+        min=0.0,
+        subtype='DISTANCE',
+    )
+
+    extend: bpy.props.BoolProperty(
+        name="Extend",
+        description="Extend the selection",
+        default=True,
+    )
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'EDIT_MESH' and any(obj.data.shape_keys for obj in context.objects_in_mode_unique_data)
+
+    def execute(self, context):
+        min_distance = self.min_distance
+        patterns = [pattern.strip() for pattern in self.pattern.split(",") if pattern.strip()]
+        # When adjusting properties in the Redo Panel, the mesh is always the same, so the index can be re-used even if it has been marked as
+        # outdated
+        is_repeat = self.options.is_repeat
+        objects = [obj for obj in context.objects_in_mode_unique_data if obj.data.shape_keys]
+
+        # Add vertex selection mode to the currently active selection modes
+        bpy.ops.mesh.select_mode(use_extend=True, type='VERT', action='ENABLE')
+        # Set to object mode so that data can be accessed in bulk, going back to EDIT mode afterwards so it doesn't look like the mode was changed
+        with object_mode_round_trip():
+            for obj in objects:
+                me = obj.data
+                vertices = me.vertices
+                num_verts = len(vertices)
+                key_blocks = me.shape_keys.key_blocks
+                signature = get_displacement_index_signature(me)
+                mesh_pointer = me.as_pointer()
+                cached = _displacement_index_cache.get(mesh_pointer)
+                if cached and cached[0] == signature and (is_repeat or not cached[1]):
+                    displacement_index = cached[2]
+                else:
+                    displacement_index = build_displacement_index(key_blocks, num_verts)
+                    _displacement_index_cache[mesh_pointer] = [signature, False, displacement_index]
+
+                key_names = [name for name in displacement_index if any(fnmatchcase(name, pattern) for pattern in patterns)]
+                # Number of matching shape keys that move each vertex
+                counts = np.zeros(num_verts, dtype=np.intc)
+                for key_name in key_names:
+                    moved, magnitudes = displacement_index[key_name]
+                    # Each vertex is only in `moved` once, so this is safe to do without np.add.at
+                    counts[moved[magnitudes > min_distance]] += 1
+
+                if self.mode == 'ANY':
+                    select = counts > 0
+                else:
+                    select = counts == len(key_names) if key_names else np.zeros(num_verts, dtype=bool)
+
+                hide = get_hidden(me)
+                select &= ~hide
+                if self.extend:
+                    select |= get_selection(me)
+                vertices.foreach_set('select', select)
+
+        # Update edge/face selection to match the vertex selection
+        for obj in objects:
+            me = obj.data
+            bm = bmesh.from_edit_mesh(me)
+            bm.select_flush_mode()
+            bmesh.update_edit_mesh(me, loop_triangles=False, destructive=False)
+        # Only the selection and mode were changed, so the index is still valid
+        ignore_geometry_updates()
+        return {'FINISHED'}
+
+
+def draw_menu(self, context):
+    layout = self.layout
+    layout.separator()
+    layout.operator(MYSTERYEM_select_shape_key_vertices.bl_idname)
+    layout.operator(MYSTERYEM_select_multi_shape_key_vertices.bl_idname)
+
+
+def register():
+    bpy.utils.register_class(MYSTERYEM_select_shape_key_vertices)
+    bpy.utils.register_class(MYSTERYEM_select_multi_shape_key_vertices)
+    bpy.types.VIEW3D_MT_select_edit_mesh.append(draw_menu)
+    bpy.app.handlers.depsgraph_update_post.append(mark_displacement_indices_outdated)
+    bpy.app.handlers.load_post.append(clear_displacement_caches)
+
+
+def unregister():
+    bpy.app.handlers.load_post.remove(clear_displacement_caches)
+    bpy.app.handlers.depsgraph_update_post.remove(mark_displacement_indices_outdated)
+    if bpy.app.timers.is_registered(stop_ignoring_geometry_updates):
+        bpy.app.timers.unregister(stop_ignoring_geometry_updates)
+    clear_displacement_caches(None)
+    bpy.types.VIEW3D_MT_select_edit_mesh.remove(draw_menu)
+    bpy.utils.unregister_class(MYSTERYEM_select_multi_shape_key_vertices)
+    bpy.utils.unregister_class(MYSTERYEM_select_shape_key_vertices)
+
+
+# Test from the text editor
+if __name__ == '__main__':
+    register()
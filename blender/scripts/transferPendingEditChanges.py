@@ -13,10 +13,10 @@ shape key active. The script lets you transfer those pending changes to a differ
 #  a shape key created in edit mode (bm.verts.layers.shape.new()) won't immediately appear in
 # the UI. Also note that shape keys created this way are initialised to (0,0,0) for every vertex
 
-# Name of the shape key you intended to be working on, but weren't, changes will be transfered
-# there
-# Change this to the shape key you intended to be working on
-key_name = "Key 1"
+# Names of the shape keys you intended to be working on, but weren't, changes will be transfered
+# there, multiplied by the weight of each shape key
+# Change this to the shape key(s) you intended to be working on, e.g. {"Smile_L": 0.5, "Smile_R": 0.5}
+key_weights = {"Key 1": 1.0}
 
 me = bpy.context.object.data
 bm = bmesh.from_edit_mesh(me)
@@ -25,27 +25,31 @@ bm = bmesh.from_edit_mesh(me)
 # or perform certain operators, meaning it can contain the pre-modification positions of vertices
 # still.
 active_shape_layer = bm.verts.layers.shape.active
-transfer_to_shape_layer = bm.verts.layers.shape[key_name]
+transfer_to_shape_layers = [(bm.verts.layers.shape[key_name], weight) for key_name, weight in key_weights.items()]
 
-# Add the pending changes to key_name and undo the pending changes
+# Add the pending changes to each shape key in key_weights and undo the pending changes
 for bv in bm.verts:
     active_co = bv[active_shape_layer]
     pending_co = bv.co
     if pending_co != active_co:
+        # The difference is only calculated once for all the shape keys
         difference = pending_co - active_co
-        bv[transfer_to_shape_layer] = bv[transfer_to_shape_layer] + difference
+        for transfer_to_shape_layer, weight in transfer_to_shape_layers:
+            bv[transfer_to_shape_layer] = bv[transfer_to_shape_layer] + difference * weight
         bv.co = active_co
 
-# Alternative to replace the co in key_name instead of adding
+# Alternative to replace the co in the shape keys instead of adding (weights are ignored)
 #for bv in bm.verts:
 #    active_co = bv[active_shape_layer]
 #    if bv.co != active_co:
-#        bv[transfer_to_shape_layer] = bv.co
+#        for transfer_to_shape_layer, _weight in transfer_to_shape_layers:
+#            bv[transfer_to_shape_layer] = bv.co
 #        bv.co = active_co
 
-# Alternative to replace all co instead only changed co
+# Alternative to replace all co instead only changed co (weights are ignored)
 #for bv in bm.verts:
-#    bv[transfer_to_shape_layer] = bv.co
+#    for transfer_to_shape_layer, _weight in transfer_to_shape_layers:
+#        bv[transfer_to_shape_layer] = bv.co
 #    bv.co = bv[active_shape_layer]
 
 # Update viewport display